@@ -1,7 +1,35 @@
+import time
+
+# Début de l'exécution, imports compris (rapport de démarrage à froid)
+DEBUT_EXECUTION = time.perf_counter()
+
+import uuid
+from dataclasses import replace
+
 import streamlit as st
-import numpy as np
-import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from hardy import diffusion, loci, markov, memoire, prechauffage, profilage, sessions
+from hardy.ensemble import simuler_ensemble
+from hardy.graphiques import FigureIncrementale
+from hardy.markov import quantiles_exacts
+from hardy.ressources import lire, type_mime, vignette
+from hardy.statistiques import effectifs_curseur, khi2, p_vraisemblance, test_exact
+from hardy.suivi import CLASSE_DEFAUT, suivi
+from hardy.theorie import NOMS_METHODES, choisir_methode, enveloppe
+from hardy.profilage import chrono, mesure, section
+from hardy.engine import Forces, sans_effet
+from hardy.lecture import LECTURE_MAX, VITESSES, Lecteur
+from hardy.trajectoires import Population, nouvelle_graine, trajectoire
+
+prechauffage.noter_imports(time.perf_counter() - DEBUT_EXECUTION)
+
+# Profilage (désactivé par défaut) : HARDY_PROFIL=1 pour tout le serveur, ou ?profil=1 pour sa seule session
+if st.query_params.get("profil") in ("0", "1"):
+    profilage.activer_session(st.query_params["profil"] == "1")
+profilage.debut_execution()
+section("1. Configuration")
 
 # 1. CONFIGURATION DE LA PAGE
 st.set_page_config(page_title="Loi de Hardy-Weinberg - Mission Oiseaux", layout="wide", page_icon="🦅")
@@ -59,37 +87,263 @@ def appliquer_fix(n_rr, n_vert):
     st.session_state['nb_essais'] = 0
     st.session_state['show_confirmation_fix'] = True
 
+# --- CALCULS PARTAGÉS ENTRE SESSIONS ---
+@st.cache_resource
+def image_locale(nom, largeur):
+    """Image du dépôt réduite à sa largeur d'affichage, lue une seule fois pour tout le serveur"""
+    return vignette(nom, largeur)
+
+@st.cache_resource
+def video_locale(nom):
+    """Vidéo du dépôt, lue une seule fois (Streamlit la sert ensuite par plages HTTP)"""
+    return lire(nom)
+
+@mesure("ensemble")
+@st.cache_data(max_entries=32, show_spinner="Simulation de milliers de populations...")
+def ensemble_en_cache(tailles, p0, generations, replicats, graine, forces=None):
+    """Médiane et bande 5 %–95 % de p (calcul réparti sur plusieurs processus)"""
+    return simuler_ensemble(tailles, p0, generations, replicats, graine, forces=forces)
+
+@st.cache_resource(max_entries=4)
+def operateur_derive(taille):
+    """Matrice de transition exacte pour N individus, construite une fois pour tout le serveur"""
+    return markov.operateur_derive(taille)
+
+@mesure("markov exact")
+@st.cache_data(max_entries=32)
+def quantiles_exacts_en_cache(taille, p0, generations):
+    """Médiane et bande 5 %–95 % exactes de p"""
+    return quantiles_exacts(operateur_derive(taille), p0, generations)
+
+@mesure("locus")
+@st.cache_data(max_entries=16, show_spinner="Simulation des locus...")
+def loci_en_cache(taille, nb_loci, alleles, generations, graine):
+    """Histogrammes des fréquences à travers les locus, génération par génération"""
+    return loci.resumer(taille, nb_loci, alleles, generations, graine)
+
+@st.cache_data(max_entries=64)
+def enveloppe_calculee(taille, p0, horizon, methode, graine=None):
+    """Enveloppe théorique de p sur les générations 0..horizon"""
+    operateur = operateur_derive(taille) if methode == "exacte" else None
+    return enveloppe(taille, p0, horizon, methode, operateur, graine)[0]
+
+@mesure("enveloppe")
+def enveloppe_en_cache(taille, p0, generations, graine=None):
+    """Enveloppe théorique de p, calculée par la méthode adaptée à (N, horizon)
+
+    Elle est calculée jusqu'à la puissance de 2 supérieure puis coupée à G :
+    les clics +1 / +10 relisent le même calcul (un ensemble Monte-Carlo n'est
+    refait qu'à chaque doublement de l'horizon).
+    """
+    methode = choisir_methode(taille, p0, generations)
+    horizon = max(1 << (generations - 1).bit_length(), HORIZON_ENVELOPPE)
+    return enveloppe_calculee(taille, p0, horizon, methode, graine).extrait(generations), methode
+
+@st.cache_data(max_entries=8)
+def absorption_en_cache(tailles, p0, generations):
+    """Probabilité que R soit fixé ou perdu avant chaque génération 0..G (série de Kimura), par taille"""
+    return {n: diffusion.proba_absorption_avant(n, p0, generations) for n in tailles}
+
+@mesure("figure")
+def figure_population(cle, population, hist, noms, couleurs, titre, enveloppe=None,
+                      reference=None, noms_reference=()):
+    """Figure de la session pour cette population : seules les nouvelles générations y sont ajoutées"""
+    figures = st.session_state['figures']
+    fig = figures.get(cle)
+    if fig is None or fig.lignee != population.lignee:
+        fig = figures[cle] = FigureIncrementale(population.lignee, noms, couleurs, titre,
+                                                noms_reference=noms_reference)
+    return fig.mettre_a_jour(hist, enveloppe, reference=reference)
+
+def reglages_forces():
+    """Curseurs des forces évolutives de l'étape 4 ; renvoie None si aucune n'est activée"""
+    with st.expander("⚖️ Briser les autres conditions de Hardy-Weinberg : sélection, mutations, migrations"):
+        st.caption("Chaque force modifie p de façon prévisible avant le tirage au sort de la génération suivante. "
+                   "La courbe en pointillés montre la même population (même hasard) sans ces forces.")
+        fitness, mutation, migration, p_source = (1.0, 1.0, 1.0), (0.0, 0.0), 0.0, 0.0
+        f1, f2, f3 = st.columns(3)
+        with f1:
+            if st.toggle("🦅 Sélection naturelle", key="force_selection"):
+                fitness = (st.slider("Valeur sélective des bleus (R//R)", 0.0, 1.0, 1.0, 0.05, key="w_RR"),
+                           st.slider("Valeur sélective des magentas (R//r)", 0.0, 1.0, 1.0, 0.05, key="w_Rr"),
+                           st.slider("Valeur sélective des verts (r//r)", 0.0, 1.0, 0.8, 0.05, key="w_rr"))
+        with f2:
+            if st.toggle("🧬 Mutations", key="force_mutation"):
+                mutation = (st.slider("Taux de mutation R → r (par génération)", 0.0, 0.05, 0.01, 0.001,
+                                      format="%.3f", key="mutation_u"),
+                            st.slider("Taux de mutation r → R (par génération)", 0.0, 0.05, 0.0, 0.001,
+                                      format="%.3f", key="mutation_v"))
+        with f3:
+            if st.toggle("🛫 Migrations", key="force_migration"):
+                migration = st.slider("Part d'immigrants à chaque génération", 0.0, 0.5, 0.05, 0.01,
+                                      key="migration_m")
+                p_source = st.slider("Fréquence de R chez les immigrants", 0.0, 1.0, 0.9, 0.05, key="migration_p")
+    forces = Forces(fitness, mutation, migration, p_source)
+    return None if sans_effet(forces) else forces
+
+@mesure("figure")
+def figure_eventail(hist, titre, couleur, couleur_bande):
+    """Graphique en éventail : bande 5 %–95 % et médiane de p"""
+    x = hist.generations
+    fig = go.Figure([
+        go.Scatter(x=x, y=hist.valeurs[:, 2], mode="lines", line_width=0,
+                   showlegend=False, hoverinfo="skip"),
+        go.Scatter(x=x, y=hist.valeurs[:, 0], mode="lines", line_width=0, fill="tonexty",
+                   fillcolor=couleur_bande, name="90 % des populations"),
+        go.Scatter(x=x, y=hist.valeurs[:, 1], mode="lines", line_color=couleur, name="Médiane de p (R)"),
+    ])
+    fig.update_layout(title=titre, xaxis_title="G", yaxis_title="Freq", yaxis_range=[0, 1])
+    return fig
+
+@mesure("plotly_chart")
+def afficher_figure(fig, cle):
+    """Envoi de la figure au navigateur (sérialisation JSON comprise)"""
+    st.plotly_chart(fig, use_container_width=True, key=cle)
+
+def graphiques_etape3(population, voir_enveloppe=False):
+    """Les deux graphiques de l'étape 3 (N=5000 et N=10000), complétés des nouvelles générations"""
+    with chrono("simulation"):
+        traj = trajectoire(population)
+    c1, c2 = st.columns(2)
+    for colonne, j, n in ((c1, 0, 5000), (c2, 1, 10000)):
+        with colonne:
+            st.markdown(f"#### Population de N={n}")
+            env = None
+            if voir_enveloppe:
+                env, methode = enveloppe_en_cache(n, population.p0, max(population.generations, 1))
+                st.caption(f"Enveloppe : {NOMS_METHODES[methode]}")
+            fig = figure_population(f"chart_{n}", population, traj.alleles[j], ALLELES_ETAPE3,
+                                    COULEURS_ETAPE3, "Évolution des fréquences alléliques", env)
+            afficher_figure(fig, f"chart_{n}")
+
+def lecteur_etape3(population, vitesse):
+    """Lecteur de la session, relancé si la population ou la vitesse ont changé depuis sa dernière image"""
+    lecteur = st.session_state['lecteur']
+    if lecteur is not None and (lecteur.vitesse != vitesse or lecteur.derniere != population or lecteur.abandonne):
+        lecteur.arreter()
+        lecteur = None
+    if lecteur is None:
+        lecteur = st.session_state['lecteur'] = Lecteur(population, vitesse, LECTURE_MAX)
+    return lecteur
+
+def arreter_lecture():
+    lecteur = st.session_state.get('lecteur')
+    if lecteur is not None:
+        lecteur.arreter()
+        st.session_state['lecteur'] = None
+
+@mesure("image de lecture")
+def image_lecture():
+    """Une image de la lecture automatique : dernière étape déposée par le lecteur, sans l'attendre
+
+    Exécutée en fragment à chaque étape du lecteur (`Lecteur.periode`), elle ne bloque
+    jamais le script. Résultats et empreinte mémoire sont envoyés à la pause,
+    pas à chaque image.
+    """
+    lecteur = st.session_state['lecteur']
+    if lecteur is None:
+        return
+    pop = lecteur.recuperer()
+    if pop is not None:
+        st.session_state['pop_etape3'] = pop
+        sessions.activite(st.session_state['id_session'])
+    if lecteur.termine:
+        # Fin de la lecture : une exécution complète arrête les images et publie les résultats
+        st.rerun()
+    graphiques_etape3(st.session_state['pop_etape3'])
+
 # --- INITIALISATION ROBUSTE ---
+ALLELES_ETAPE3 = ["R (p)", "r (q)"]
+ALLELES_ETAPE4 = ["p (R)", "q (r)"]
+# Couleurs par défaut de Plotly, comme avant le passage aux figures incrémentales
+COULEURS_ETAPE3 = ["#636efa", "#EF553B"]
+REPLICATS_ENSEMBLE = 10_000
+GENERATIONS_ENSEMBLE = 200
+# Horizon minimal des enveloppes théoriques (arrondi ensuite à la puissance de 2 supérieure)
+HORIZON_ENVELOPPE = 64
+# Horizon de la courbe de fixation / perte : 4N générations pour N=500
+GENERATIONS_ABSORPTION = 2000
+
 keys_defaults = {
     'pop_RR': 1500,
     'pop_rr': 1000,
     'nb_essais': 0,
     'last_p_seen': 0.50,
     'etape2': False,
-    'history_pheno_5000': [],
-    'history_alleles_5000': [],
-    'history_pheno_10000': [],
-    'history_alleles_10000': [],
-    'current_gen_5000': 0,
-    'current_gen_10000': 0,
-    'current_p_5000': 0.0,
-    'current_p_10000': 0.0,
+    'pop_etape3': None,
     'show_explication_section': False,
     'show_video': False,
-    'history_N500': [],
-    'history_N20000': [],
-    'gen_N500': 0,
-    'gen_N20000': 0,
-    'current_p_N500': 0.0,
-    'current_p_N20000': 0.0,
+    'pop_N500': None,
+    'pop_N20000': None,
+    'loci': None,
+    'figures': {},
+    'lecteur': None,
+    'id_session': None,
+    'suivi_session': None,
+    'suivi_trajectoires': {},
     'show_confirmation_fix': False
 }
 
 for key, val in keys_defaults.items():
     if key not in st.session_state:
         st.session_state[key] = val
+if st.session_state['id_session'] is None:
+    # Identifiant propre à l'exercice : une réinitialisation démarre une nouvelle ligne pour l'enseignant
+    st.session_state['id_session'] = uuid.uuid4().hex
+
+@mesure("suivi")
+def publier_resultats():
+    """Dépose dans la base de la classe ce qui a changé depuis le dernier envoi (sans attendre l'écriture)"""
+    etat = st.session_state
+    base = suivi()
+    nb_RR, nb_rr = etat['pop_RR'], etat['pop_rr']
+    resume = (nb_RR, nb_rr, etat['last_p_seen'], etat['nb_essais'])
+    if resume != etat['suivi_session']:
+        etat['suivi_session'] = resume
+        base.session(etat['id_session'], st.query_params.get("classe", CLASSE_DEFAUT), nb_RR,
+                     max(5000 - nb_RR - nb_rr, 0), nb_rr, etat['last_p_seen'], etat['nb_essais'])
+    for pop in (etat['pop_etape3'], etat['pop_N500'], etat['pop_N20000']):
+        if pop is None or pop.generations == 0 or etat['suivi_trajectoires'].get(pop.lignee) == pop.generations:
+            continue
+        etat['suivi_trajectoires'][pop.lignee] = pop.generations
+        traj = trajectoire(pop)
+        for j, n in enumerate(pop.tailles):
+            # Un historique compacté n'a plus une ligne par génération : on garde le dernier envoi complet
+            if traj.alleles[j].compactions == 0:
+                base.trajectoire(etat['id_session'], n, pop.graine, pop.p0, traj.alleles[j].valeurs[:, 0])
+
+@mesure("memoire")
+def signaler_session():
+    """Empreinte mémoire de la session pour le registre du serveur (page enseignant)
+
+    Les figures sont comptées par leurs données (`octets`) : parcourir les
+    objets Plotly coûterait plus cher que l'affichage. Si la session reste
+    inactive, le registre vide ses figures ; elles se reconstruisent au
+    prochain affichage à partir des populations.
+    """
+    etat = st.session_state
+    figures = etat['figures']
+    octets = sum(fig.octets() for fig in figures.values())
+    # Le lecteur (fil de calcul, file d'attente) n'a rien à compter
+    octets += sum(memoire.taille(etat[cle]) for cle in etat if cle not in ('figures', 'lecteur'))
+    populations = (etat['pop_etape3'], etat['pop_N500'], etat['pop_N20000'])
+    generations = sum(pop.generations for pop in populations if pop is not None)
+    sessions.signaler(etat['id_session'], octets, generations, figures.clear,
+                      st.query_params.get("classe", CLASSE_DEFAUT))
+
+def fin_fragment():
+    """Fin d'un fragment : s'il est réexécuté seul, publie et signale ce qu'il a changé
+
+    Lors d'une exécution complète de la page, c'est la fin du script qui s'en
+    charge, une seule fois.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is not None and ctx.fragment_ids_this_run:
+        publier_resultats()
+        signaler_session()
 
 # 2. INTRODUCTION
+section("2. Introduction")
 st.title("🦅 Mission : comprendre la loi de Hardy-Weinberg")
 st.markdown("""
 Considérons une population d'oiseaux à 3 **phénotypes** (couleurs) gouvernés par 1 gène à 2 allèles **R** et **r**. 
@@ -99,22 +353,21 @@ et les **magentas** sont **(R//r)** (hétérozygotes).
 *Effectif total de la population : **5000 oiseaux**.*
 """)
 
-url_base = "https://raw.githubusercontent.com/olivierhoarau97410/SVT_hardy/main/"
-
 col_img1, col_img2, col_img3 = st.columns(3)
 with col_img1:
-    st.image(url_base + "bleu.png", width=100)
+    st.image(image_locale("bleu.png", 100), width=100)
     st.info("**[Bleu]** : Génotype (R//R)")
 with col_img2:
-    st.image(url_base + "magenta.png", width=100)
+    st.image(image_locale("magenta.png", 100), width=100)
     st.warning("**[Magenta]** : Génotype (R//r)")
 with col_img3:
-    st.image(url_base + "vert.png", width=100)
+    st.image(image_locale("vert.png", 100), width=100)
     st.success("**[Vert]** : Génotype (r//r)")
 
 st.divider()
 
 # 3. ÉTAPE 1 : POPULATION INITIALE
+section("3. Étape 1 : population initiale")
 st.header("1. Définir votre population initiale")
 c_pop = st.columns(3)
 with c_pop[0]:
@@ -129,8 +382,13 @@ with c_pop[2]:
     st.metric("Nb Magentas (R//r)", nb_Rr_obs)
 
 # 4. ÉTAPE 2 : MATCHING THEORIQUE
-st.header("2. Mission : Retrouvez le modèle théorique")
-st.info("""
+section("4. Étape 2 : matching")
+@st.fragment
+@mesure("fragment étape 2")
+def etape2_matching(nb_RR_obs, nb_Rr_obs, nb_rr_obs):
+    """Curseur p et comparaison théorie / terrain (bouger le curseur ne réexécute que ce bloc)"""
+    st.header("2. Mission : Retrouvez le modèle théorique")
+    st.info("""
 💡 **Si votre population suit la loi de Hardy-Weinberg**, on doit pouvoir trouver :
 - La fréquence **p** (%) de l'allèle **R**
 - La fréquence **q** (%) de l'allèle **r** (avec p + q = 1)
@@ -143,34 +401,46 @@ Telles que les effectifs théoriques correspondent aux effectifs observés :
 🎯 **Votre mission** : Ajustez le curseur de p pour faire correspondre la théorie et la réalité !
 """)
 
-col_jeu, col_visu = st.columns([1, 1.5])
-with col_jeu:
-    p_slider = st.slider("Ajustez la fréquence de l'allèle R (p)", 0.0, 1.0, 0.50, step=0.01)
-    q_slider = round(1.0 - p_slider, 2)
-    st.write(f"Fréquence de l'allèle r (q) = **{q_slider}**")
-
-theo_RR = int((p_slider**2) * 5000)
-theo_Rr = int((2 * p_slider * q_slider) * 5000)
-theo_rr = int((q_slider**2) * 5000)
-
-if p_slider != st.session_state['last_p_seen']:
-    st.session_state['nb_essais'] += 1
-    st.session_state['last_p_seen'] = p_slider
-
-with col_visu:
-    df_comp = pd.DataFrame({
-        "Phénotype": ["[Bleu] (R//R)", "[Magenta] (R//r)", "[Vert] (r//r)"],
-        "Réel (Terrain)": [nb_RR_obs, nb_Rr_obs, nb_rr_obs],
-        "Théorie (p² / 2pq / q²)": [theo_RR, theo_Rr, theo_rr]
-    })
-    st.table(df_comp)
-
-precision = 80 
-matching_reussi = abs(nb_RR_obs - theo_RR) <= precision and abs(nb_rr_obs - theo_rr) <= precision
-
-# AFFICHAGE DE LA CONFIRMATION SI ON A FIXÉ LES VALEURS
-if st.session_state.get('show_confirmation_fix', False):
-    st.markdown(f"""
+    col_jeu, col_visu = st.columns([1, 1.5])
+    with col_jeu:
+        p_slider = st.slider("Ajustez la fréquence de l'allèle R (p)", 0.0, 1.0, 0.50, step=0.01)
+        q_slider = round(1.0 - p_slider, 2)
+        st.write(f"Fréquence de l'allèle r (q) = **{q_slider}**")
+
+    # Lecture dans la table des 101 positions du curseur (mêmes arrondis que p², 2pq, q² × 5000)
+    theo_RR, theo_Rr, theo_rr = effectifs_curseur(p_slider, 5000)
+
+    if p_slider != st.session_state['last_p_seen']:
+        st.session_state['nb_essais'] += 1
+        st.session_state['last_p_seen'] = p_slider
+
+    with col_visu:
+        # Tableau en Markdown : st.table chargerait pandas dès le premier affichage
+        st.markdown(
+            "| Phénotype | Réel (Terrain) | Théorie (p² / 2pq / q²) |\n|---|---:|---:|\n"
+            f"| [Bleu] (R//R) | {nb_RR_obs} | {theo_RR} |\n"
+            f"| [Magenta] (R//r) | {nb_Rr_obs} | {theo_Rr} |\n"
+            f"| [Vert] (r//r) | {nb_rr_obs} | {theo_rr} |"
+        )
+
+    precision = 80 
+    matching_reussi = abs(nb_RR_obs - theo_RR) <= precision and abs(nb_rr_obs - theo_rr) <= precision
+
+    # Statistiques : seulement une fois le matching réussi ou l'aide affichée (sinon p serait donné)
+    if matching_reussi or st.session_state['nb_essais'] > 10:
+        with st.expander("📐 Pour aller plus loin : que disent les tests statistiques ?"):
+            stat_khi2, p_khi2 = khi2(nb_RR_obs, nb_Rr_obs, nb_rr_obs)
+            mi_p = test_exact(nb_RR_obs, nb_Rr_obs, nb_rr_obs)
+            s1, s2, s3 = st.columns(3)
+            s1.metric("p le plus vraisemblable", f"{p_vraisemblance(nb_RR_obs, nb_Rr_obs, nb_rr_obs):.3f}")
+            s2.metric("Khi² (1 ddl)", f"{stat_khi2:.2f}", help=f"p-valeur : {p_khi2:.3g}")
+            s3.metric("Test exact (mi-p)", f"{mi_p:.3g}")
+            st.caption("p = (2 × bleus + magentas) / (2 × 5000). Une p-valeur inférieure à 0,05 indique "
+                       "un écart significatif à l'équilibre de Hardy-Weinberg (test exact de Wigginton et al., 2005).")
+
+    # AFFICHAGE DE LA CONFIRMATION SI ON A FIXÉ LES VALEURS
+    if st.session_state.get('show_confirmation_fix', False):
+        st.markdown(f"""
 <div class="big-success-box">
     ✅ POPULATION AJUSTÉE POUR SUIVRE HARDY-WEINBERG !
     <br><br>
@@ -184,12 +454,12 @@ if st.session_state.get('show_confirmation_fix', False):
     </span>
 </div>
 """, unsafe_allow_html=True)
-    st.session_state['show_confirmation_fix'] = False
+        st.session_state['show_confirmation_fix'] = False
 
-if matching_reussi:
-    st.success("🎯 MATCHING RÉUSSI ! Le modèle mathématique correspond à votre population.")
+    if matching_reussi:
+        st.success("🎯 MATCHING RÉUSSI ! Le modèle mathématique correspond à votre population.")
     
-    st.info("""
+        st.info("""
 📊 **Prédiction de Hardy-Weinberg** : Les fréquences alléliques **p** et **q** 
 (et donc les phénotypes [Bleu], [Magenta], [Vert]) devraient rester **constantes** 
 au fil des générations.
@@ -201,21 +471,21 @@ restent vraiment stables dans le temps.
 **Testons cette prédiction !** ⬇️
 """)
     
-    if st.button("🔬 Lancer la simulation temporelle (accouplements et descendants)", type="primary"):
-        st.session_state['p_initial'] = p_slider
-        st.session_state['current_p'] = (2 * nb_RR_obs + nb_Rr_obs) / 10000
-        st.session_state['etape2'] = True
-        st.rerun()
-else:
-    if st.session_state['nb_essais'] > 10:  # CHANGÉ DE 15 À 10
-        # Message clignotant en gros
-        st.markdown("""
+        if st.button("🔬 Lancer la simulation temporelle (accouplements et descendants)", type="primary"):
+            st.session_state['p_initial'] = p_slider
+            st.session_state['current_p'] = (2 * nb_RR_obs + nb_Rr_obs) / 10000
+            st.session_state['etape2'] = True
+            st.rerun()
+    else:
+        if st.session_state['nb_essais'] > 10:  # CHANGÉ DE 15 À 10
+            # Message clignotant en gros
+            st.markdown("""
 <div class="big-warning-box">
     ⚠️ Votre population observée ne semble pas suivre l'équilibre de Hardy-Weinberg !
 </div>
 """, unsafe_allow_html=True)
         
-        st.info(f"""
+            st.info(f"""
 💡 **Deux possibilités :**
 
 **Option 1** : Ajustez p et q pour mieux correspondre à vos observations
@@ -228,8 +498,8 @@ else:
 - Verts (r//r) : **{theo_rr}** oiseaux
 """)
         
-        # Avertissement en rouge AVANT le bouton
-        st.markdown(f"""
+            # Avertissement en rouge AVANT le bouton
+            st.markdown(f"""
 <div class="attention-box">
     ⚠️ ATTENTION : Si vous cliquez sur le bouton ci-dessous, VOS valeurs actuelles 
     ({nb_RR_obs} bleus, {nb_Rr_obs} magentas, {nb_rr_obs} verts) seront REMPLACÉES 
@@ -237,13 +507,23 @@ else:
 </div>
 """, unsafe_allow_html=True)
         
-        st.button("🛠️ Fixer ma population sur ces valeurs théoriques", 
-                  on_click=appliquer_fix, 
-                  args=(theo_RR, theo_rr),
-                  type="secondary")
+            if st.button("🛠️ Fixer ma population sur ces valeurs théoriques", 
+                         on_click=appliquer_fix, 
+                         args=(theo_RR, theo_rr),
+                         type="secondary"):
+                # Réexécution complète : l'étape 1 doit afficher les nouveaux effectifs
+                st.rerun()
+
+    fin_fragment()
+
+etape2_matching(nb_RR_obs, nb_Rr_obs, nb_rr_obs)
 
 # 5. ÉTAPE 3 : LA SIMULATION - COMPARAISON N=5000 vs N=10000
-if st.session_state['etape2']:
+section("5. Étape 3 : simulation")
+@st.fragment
+@mesure("fragment étape 3")
+def etape3_simulation(nb_RR_obs, nb_Rr_obs, nb_rr_obs):
+    """Simulation N=5000 / N=10000 : ses boutons ne réexécutent que ce bloc"""
     st.divider()
     st.header("3. Évolution des fréquences au cours du temps")
     st.markdown("""
@@ -255,109 +535,56 @@ de la taille sur la stabilité des fréquences.
 """)
     
     # Initialisation des deux populations si pas déjà fait
-    if not st.session_state.get('history_pheno_5000'):
-        st.session_state['history_pheno_5000'] = []
-        st.session_state['history_alleles_5000'] = []
-        st.session_state['current_gen_5000'] = 0
-        st.session_state['current_p_5000'] = (2 * nb_RR_obs + nb_Rr_obs) / 10000
-        
-        # Génération 0 pour N=5000
-        p_init = st.session_state['current_p_5000']
-        st.session_state['history_pheno_5000'].extend([
-            {"G": 0, "Phéno": "[Bleu]", "N": nb_RR_obs},
-            {"G": 0, "Phéno": "[Magenta]", "N": nb_Rr_obs},
-            {"G": 0, "Phéno": "[Vert]", "N": nb_rr_obs}
-        ])
-        st.session_state['history_alleles_5000'].extend([
-            {"G": 0, "Allèle": "R (p)", "Freq": p_init},
-            {"G": 0, "Allèle": "r (q)", "Freq": 1 - p_init}
-        ])
-    
-    if not st.session_state.get('history_pheno_10000'):
-        st.session_state['history_pheno_10000'] = []
-        st.session_state['history_alleles_10000'] = []
-        st.session_state['current_gen_10000'] = 0
-        st.session_state['current_p_10000'] = (2 * nb_RR_obs + nb_Rr_obs) / 10000
-        
-        # Génération 0 pour N=10000 (proportions identiques)
-        p_init = st.session_state['current_p_10000']
-        nb_RR_10k = nb_RR_obs * 2
-        nb_Rr_10k = nb_Rr_obs * 2
-        nb_rr_10k = nb_rr_obs * 2
-        
-        st.session_state['history_pheno_10000'].extend([
-            {"G": 0, "Phéno": "[Bleu]", "N": nb_RR_10k},
-            {"G": 0, "Phéno": "[Magenta]", "N": nb_Rr_10k},
-            {"G": 0, "Phéno": "[Vert]", "N": nb_rr_10k}
-        ])
-        st.session_state['history_alleles_10000'].extend([
-            {"G": 0, "Allèle": "R (p)", "Freq": p_init},
-            {"G": 0, "Allèle": "r (q)", "Freq": 1 - p_init}
-        ])
+    # (seules la graine et les conditions initiales sont gardées en session)
+    if st.session_state['pop_etape3'] is None:
+        st.session_state['pop_etape3'] = Population(
+            graine=nouvelle_graine(),
+            tailles=(5000, 10000),
+            p0=(2 * nb_RR_obs + nb_Rr_obs) / 10000,
+            # Génération 0 : effectifs observés, proportions identiques pour N=10000
+            effectifs0=((nb_RR_obs, nb_Rr_obs, nb_rr_obs),
+                        (nb_RR_obs * 2, nb_Rr_obs * 2, nb_rr_obs * 2))
+        )
+
+    individus = st.toggle("🐦 Simuler chaque oiseau et ses accouplements (au lieu de tirer directement p², 2pq, q²)",
+                          key="mode_individus")
+    mode = "individus" if individus else "proportions"
+    if st.session_state['pop_etape3'].mode != mode:
+        st.session_state['pop_etape3'] = replace(st.session_state['pop_etape3'], mode=mode)
 
     col_btn1, col_btn2 = st.columns(2)
     steps = 0
     if col_btn1.button("Génération suivante (+1)", type="primary"): steps = 1
     if col_btn2.button("Accélérer (+10 générations)", type="primary"): steps = 10
 
+    # Lecture automatique : pause = désactiver, pas à pas = bouton +1, vitesse réglable
+    c_lecture, c_vitesse = st.columns([1, 2])
+    lecture = c_lecture.toggle("▶️ Lecture automatique", key="lecture_etape3")
+    vitesse = c_vitesse.select_slider("Vitesse (générations par seconde)", VITESSES, value=5,
+                                      key="vitesse_etape3")
+
+    # Pas de st.rerun() : les graphiques sont dessinés plus bas, dans la même exécution du fragment
     if steps > 0:
-        for _ in range(steps):
-            # Simulation N=5000
-            last_p_5k = st.session_state['current_p_5000']
-            st.session_state['current_gen_5000'] += 1
-            gen_5k = st.session_state['current_gen_5000']
-            tirage_5k = np.random.multinomial(5000, [last_p_5k**2, 2*last_p_5k*(1-last_p_5k), (1-last_p_5k)**2])
-            new_p_5k = (2 * tirage_5k[0] + tirage_5k[1]) / 10000
-            st.session_state['current_p_5000'] = new_p_5k
-            st.session_state['history_pheno_5000'].extend([
-                {"G": gen_5k, "Phéno": "[Bleu]", "N": tirage_5k[0]}, 
-                {"G": gen_5k, "Phéno": "[Magenta]", "N": tirage_5k[1]}, 
-                {"G": gen_5k, "Phéno": "[Vert]", "N": tirage_5k[2]}
-            ])
-            st.session_state['history_alleles_5000'].extend([
-                {"G": gen_5k, "Allèle": "R (p)", "Freq": new_p_5k}, 
-                {"G": gen_5k, "Allèle": "r (q)", "Freq": 1 - new_p_5k}
-            ])
-            
-            # Simulation N=10000
-            last_p_10k = st.session_state['current_p_10000']
-            st.session_state['current_gen_10000'] += 1
-            gen_10k = st.session_state['current_gen_10000']
-            tirage_10k = np.random.multinomial(10000, [last_p_10k**2, 2*last_p_10k*(1-last_p_10k), (1-last_p_10k)**2])
-            new_p_10k = (2 * tirage_10k[0] + tirage_10k[1]) / 20000
-            st.session_state['current_p_10000'] = new_p_10k
-            st.session_state['history_pheno_10000'].extend([
-                {"G": gen_10k, "Phéno": "[Bleu]", "N": tirage_10k[0]}, 
-                {"G": gen_10k, "Phéno": "[Magenta]", "N": tirage_10k[1]}, 
-                {"G": gen_10k, "Phéno": "[Vert]", "N": tirage_10k[2]}
-            ])
-            st.session_state['history_alleles_10000'].extend([
-                {"G": gen_10k, "Allèle": "R (p)", "Freq": new_p_10k}, 
-                {"G": gen_10k, "Allèle": "r (q)", "Freq": 1 - new_p_10k}
-            ])
-        st.rerun()
+        st.session_state['pop_etape3'] = st.session_state['pop_etape3'].avancer(steps)
 
     # Affichage des graphiques
-    c1, c2 = st.columns(2)
-    
-    with c1:
-        st.markdown("#### Population de N=5000")
-        df_a_5k = pd.DataFrame(st.session_state['history_alleles_5000'])
-        fig_5k = px.line(df_a_5k, x="G", y="Freq", color="Allèle", 
-                         title="Évolution des fréquences alléliques", 
-                         range_y=[0, 1])
-        st.plotly_chart(fig_5k, use_container_width=True)
-    
-    with c2:
-        st.markdown("#### Population de N=10000")
-        df_a_10k = pd.DataFrame(st.session_state['history_alleles_10000'])
-        fig_10k = px.line(df_a_10k, x="G", y="Freq", color="Allèle", 
-                          title="Évolution des fréquences alléliques", 
-                          range_y=[0, 1])
-        st.plotly_chart(fig_10k, use_container_width=True)
+    pop3 = st.session_state['pop_etape3']
+    voir_enveloppe3 = st.toggle("📐 Afficher l'enveloppe théorique de la dérive (90 % des populations)",
+                                key="enveloppe_etape3", disabled=lecture)
+    lecteur = lecteur_etape3(pop3, vitesse) if lecture else None
+    if lecteur is None:
+        arreter_lecture()
+        graphiques_etape3(pop3, voir_enveloppe3)
+    elif lecteur.termine:
+        graphiques_etape3(pop3)
+        st.info(f"⏹️ Lecture arrêtée après {LECTURE_MAX} générations : désactivez la lecture pour continuer.")
+    else:
+        # Les images sont dessinées par un fragment à part, réexécuté au rythme des étapes
+        st.fragment(image_lecture, run_every=lecteur.periode)()
+    st.caption(f"🎲 Graine de la simulation : {pop3.graine} (permet de rejouer exactement ces courbes)")
 
     # QUESTION SOUS LES GRAPHIQUES
-    if st.session_state['current_gen_5000'] >= 10 and not st.session_state['show_explication_section']:
+    if pop3.generations >= 10 and not st.session_state['show_explication_section']:
         st.divider()
         st.subheader("🧐 Analyse des résultats")
         st.markdown("**Observez bien les deux graphiques ci-dessus.**")
@@ -374,8 +601,17 @@ de la taille sur la stabilité des fréquences.
         elif reponse and reponse != "NON, elles oscillent PLUS dans la petite population (N=5000)":
             st.warning("🤔 Regardez bien : les oscillations sont-elles identiques dans les deux graphiques ?")
 
+    fin_fragment()
+
+if st.session_state['etape2']:
+    etape3_simulation(nb_RR_obs, nb_Rr_obs, nb_rr_obs)
+
 # 6. ÉTAPE 4 : IMPACT DE LA TAILLE
-if st.session_state.get('show_explication_section', False):
+section("6. Étape 4 : dérive")
+@st.fragment
+@mesure("fragment étape 4")
+def etape4_derive():
+    """Dérive génétique N=500 / N=20000 : ses boutons et options ne réexécutent que ce bloc"""
     st.divider()
     st.header("🔬 4. L'impact de la taille de la population")
     st.info("""
@@ -389,68 +625,99 @@ Plus la population est **grande**, plus ces fluctuations sont **faibles**.
     
     p_init = st.session_state.get('p_initial', 0.5)
     
-    if st.session_state['gen_N500'] == 0: 
-        st.session_state['current_p_N500'] = p_init
-    if st.session_state['gen_N20000'] == 0: 
-        st.session_state['current_p_N20000'] = p_init
-
+    for cle in ('pop_N500', 'pop_N20000'):
+        if st.session_state[cle] is None:
+            taille = 500 if cle == 'pop_N500' else 20000
+            st.session_state[cle] = Population(graine=nouvelle_graine(), tailles=(taille,), p0=p_init)
+
+    forces = reglages_forces()
+    for cle in ('pop_N500', 'pop_N20000'):
+        if st.session_state[cle].forces != forces:
+            # Même graine : la courbe avec forces se compare à la population neutre
+            st.session_state[cle] = replace(st.session_state[cle], forces=forces)
+
+    voir_enveloppe4 = st.toggle("📐 Afficher l'enveloppe théorique de la dérive (90 % des populations)",
+                                key="enveloppe_etape4")
+    if voir_enveloppe4 and forces is not None:
+        st.caption("L'enveloppe théorique ne décrit que la dérive seule : elle est masquée tant qu'une force est activée.")
     c1, c2 = st.columns(2)
 
     with c1:
         if st.button("Simuler 20 générations (N=500)"):
-            for _ in range(20):
-                st.session_state['gen_N500'] += 1
-                cp = st.session_state['current_p_N500']
-                cp = max(0, min(1, cp))
-                tir = np.random.multinomial(500, [cp**2, 2*cp*(1-cp), (1-cp)**2])
-                new_p = (2*tir[0]+tir[1])/1000
-                st.session_state['current_p_N500'] = new_p
-                st.session_state['history_N500'].append({
-                    "G": st.session_state['gen_N500'], 
-                    "Allèle": "p (R)", 
-                    "Freq": new_p
-                })
-                st.session_state['history_N500'].append({
-                    "G": st.session_state['gen_N500'], 
-                    "Allèle": "q (r)", 
-                    "Freq": 1-new_p
-                })
-            st.rerun()
-        if st.session_state['history_N500']:
-            df500 = pd.DataFrame(st.session_state['history_N500'])
-            fig500 = px.line(df500, x="G", y="Freq", color="Allèle", range_y=[0,1], 
-                             title="🌊 Dérive forte (N=500) - Fluctuations importantes",
-                             color_discrete_map={"p (R)": "red", "q (r)": "blue"})
-            st.plotly_chart(fig500, use_container_width=True)
+            st.session_state['pop_N500'] = st.session_state['pop_N500'].avancer(20)
+        pop = st.session_state['pop_N500']
+        if pop.generations > 0:
+            env = neutre = None
+            if voir_enveloppe4 and forces is None:
+                env, methode = enveloppe_en_cache(500, pop.p0, pop.generations, pop.graine)
+                st.caption(f"Enveloppe : {NOMS_METHODES[methode]}")
+            with chrono("simulation"):
+                hist = trajectoire(pop).alleles[0]
+                if forces is not None:
+                    neutre = trajectoire(replace(pop, forces=None)).alleles[0]
+            fig = figure_population("chart_N500", pop, hist, ALLELES_ETAPE4,
+                                    ["red", "blue"], "🌊 Dérive forte (N=500) - Fluctuations importantes", env,
+                                    neutre, ["p sans forces", "q sans forces"])
+            afficher_figure(fig, "chart_N500")
 
     with c2:
         if st.button("Simuler 20 générations (N=20000)"):
-            for _ in range(20):
-                st.session_state['gen_N20000'] += 1
-                cp = st.session_state['current_p_N20000']
-                cp = max(0, min(1, cp))
-                tir = np.random.multinomial(20000, [cp**2, 2*cp*(1-cp), (1-cp)**2])
-                new_p = (2*tir[0]+tir[1])/40000
-                st.session_state['current_p_N20000'] = new_p
-                st.session_state['history_N20000'].append({
-                    "G": st.session_state['gen_N20000'], 
-                    "Allèle": "p (R)", 
-                    "Freq": new_p
-                })
-                st.session_state['history_N20000'].append({
-                    "G": st.session_state['gen_N20000'], 
-                    "Allèle": "q (r)", 
-                    "Freq": 1-new_p
-                })
-            st.rerun()
-        if st.session_state['history_N20000']:
-            df20k = pd.DataFrame(st.session_state['history_N20000'])
-            fig20k = px.line(df20k, x="G", y="Freq", color="Allèle", range_y=[0,1], 
-                              title="📊 Stabilité forte (N=20000) - Hardy-Weinberg respecté",
-                              color_discrete_map={"p (R)": "green", "q (r)": "blue"})
-            st.plotly_chart(fig20k, use_container_width=True)
-
-    if st.session_state['gen_N500'] > 0 and st.session_state['gen_N20000'] > 0:
+            st.session_state['pop_N20000'] = st.session_state['pop_N20000'].avancer(20)
+        pop = st.session_state['pop_N20000']
+        if pop.generations > 0:
+            env = neutre = None
+            if voir_enveloppe4 and forces is None:
+                env, methode = enveloppe_en_cache(20000, pop.p0, pop.generations, pop.graine)
+                st.caption(f"Enveloppe : {NOMS_METHODES[methode]}")
+            with chrono("simulation"):
+                hist = trajectoire(pop).alleles[0]
+                if forces is not None:
+                    neutre = trajectoire(replace(pop, forces=None)).alleles[0]
+            fig = figure_population("chart_N20000", pop, hist, ALLELES_ETAPE4,
+                                    ["green", "blue"], "📊 Stabilité forte (N=20000) - Hardy-Weinberg respecté", env,
+                                    neutre, ["p sans forces", "q sans forces"])
+            afficher_figure(fig, "chart_N20000")
+
+    # MODE ENSEMBLE : une seule trajectoire peut être trompeuse, on en simule des milliers
+    if st.checkbox(f"📈 Simuler {REPLICATS_ENSEMBLE:,} populations de chaque taille (mode ensemble)".replace(",", " ")):
+        st.markdown("""
+La zone colorée contient **90 %** des populations simulées : plus elle s'élargit, 
+plus la dérive génétique éloigne les populations de la fréquence de départ.
+""")
+        ens = ensemble_en_cache((500, 20000), p_init, GENERATIONS_ENSEMBLE, REPLICATS_ENSEMBLE,
+                                st.session_state['pop_N500'].graine, forces)
+        if forces is not None:
+            st.caption("⚖️ Les populations simulées subissent aussi les forces évolutives activées ci-dessus.")
+        e1, e2 = st.columns(2)
+        with e1:
+            afficher_figure(figure_eventail(ens[500], "🌊 N=500 : les populations divergent",
+                                            "red", "rgba(255, 0, 0, 0.2)"), "ensemble_N500")
+        with e2:
+            afficher_figure(figure_eventail(ens[20000], "📊 N=20000 : les populations restent groupées",
+                                            "green", "rgba(0, 128, 0, 0.2)"), "ensemble_N20000")
+
+    # CALCUL EXACT : pour N=500, on calcule la loi de p au lieu de la tirer au sort
+    if st.checkbox("🧮 Calcul exact de la dérive pour N=500 (chaîne de Markov)"):
+        exact = quantiles_exacts_en_cache(500, p_init, GENERATIONS_ENSEMBLE)
+        proba_fix, temps_fix = operateur_derive(500).fixation(p_init)
+        x1, x2 = st.columns([2, 1])
+        with x1:
+            afficher_figure(figure_eventail(exact, "🧮 N=500 : loi exacte de p au fil des générations",
+                                            "purple", "rgba(128, 0, 128, 0.2)"), "exact_N500")
+        with x2:
+            st.metric("Probabilité que R finisse fixé (p = 1)", f"{proba_fix:.0%}")
+            st.metric("Temps moyen avant fixation ou disparition de R", f"{temps_fix:.0f} générations")
+            st.caption("Calcul exact à partir des probabilités de passage d'une génération à l'autre, sans tirage au sort.")
+            st.caption(f"À comparer avec N=20000 (approximation de diffusion) : "
+                       f"{diffusion.temps_moyen_absorption(20000, p_init):.0f} générations en moyenne.")
+        absorption = absorption_en_cache((500, 20000), p_init, GENERATIONS_ABSORPTION)
+        fig = go.Figure([go.Scatter(y=absorption[n], mode="lines", line_color=couleur, name=f"N={n}")
+                         for n, couleur in ((500, "red"), (20000, "green"))])
+        fig.update_layout(title="Probabilité que R soit fixé ou perdu avant la génération G (série de Kimura)",
+                          xaxis_title="G", yaxis_title="Probabilité", yaxis_range=[0, 1])
+        afficher_figure(fig, "absorption_kimura")
+
+    if st.session_state['pop_N500'].generations > 0 and st.session_state['pop_N20000'].generations > 0:
         choix_d = st.radio("**Où la loi de Hardy-Weinberg est-elle la mieux respectée ?**", 
                           ["Dans la petite population (N=500)", 
                            "Dans la grande population (N=20000)"], 
@@ -461,10 +728,59 @@ Plus la population est **grande**, plus ces fluctuations sont **faibles**.
                 st.session_state['show_video'] = True
                 st.rerun()
 
+    fin_fragment()
+
+# 6 bis. PLUSIEURS GÈNES, PLUSIEURS ALLÈLES
+@st.fragment
+@mesure("fragment locus")
+def etape4_loci():
+    """Dérive simultanée de L locus à k allèles, résumée par l'histogramme des fréquences"""
+    if not st.checkbox("🧬 Et avec plusieurs gènes et plusieurs allèles ? (ex. groupes sanguins A, B, O)"):
+        return
+    st.markdown("""
+Chaque **locus** (gène) dérive indépendamment des autres. En suivant **des centaines de locus**, 
+on voit la dérive génétique comme une distribution : au fil des générations, les fréquences 
+s'étalent puis s'accumulent à 0 (allèle perdu) et 1 (allèle fixé).
+""")
+    with st.form("parametres_loci"):
+        f1, f2, f3, f4 = st.columns(4)
+        taille = f1.number_input("Taille N", 10, 100_000, 500, step=10)
+        nb_loci = f2.number_input("Nombre de locus", 1, 2000, 1000, step=100)
+        alleles = f3.number_input("Allèles par locus", 2, 6, 3)
+        generations = f4.number_input("Générations", 1, 2000, 1000, step=100)
+        if st.form_submit_button("Lancer la simulation", type="primary"):
+            st.session_state['loci'] = dict(taille=taille, nb_loci=nb_loci, alleles=alleles,
+                                            generations=generations, graine=nouvelle_graine())
+
+    params = st.session_state['loci']
+    if params is None:
+        return
+    histos, fixes = loci_en_cache(**params)
+    g = st.slider("Génération affichée", 0, params['generations'], params['generations'], key="generation_loci")
+    classes = histos.shape[-1]
+    centres = [(i + 0.5) / classes for i in range(classes)]
+    fig = go.Figure([go.Bar(x=centres, y=histos[g, i], name=f"Allèle {i + 1}", width=1 / classes)
+                     for i in range(params['alleles'])])
+    fig.update_layout(barmode="overlay", title=f"Fréquences des allèles sur {params['nb_loci']} locus (G={g})",
+                      xaxis_title="Fréquence", yaxis_title="Nombre de locus", xaxis_range=[0, 1])
+    fig.update_traces(opacity=0.6)
+    l1, l2 = st.columns([2, 1])
+    with l1:
+        afficher_figure(fig, "histogramme_loci")
+    with l2:
+        st.metric("Locus où un allèle est fixé", f"{fixes[g]:.0%}")
+        st.caption(f"N={params['taille']}, {params['alleles']} allèles de fréquence initiale "
+                   f"1/{params['alleles']} à chaque locus. 🎲 Graine : {params['graine']}")
+
+if st.session_state.get('show_explication_section', False):
+    etape4_derive()
+    etape4_loci()
+
 # 7. CONCLUSION & QUIZ
+section("7. Conclusion")
 if st.session_state.get('show_video', False):
     st.divider()
-    st.video(url_base + "conclusion.mp4")
+    st.video(video_locale("conclusion.mp4"), format=type_mime("conclusion.mp4"))
     
     st.subheader("📝 Petit Quiz de fin")
     quiz_q = """**Selon la loi de Hardy-Weinberg, les fréquences alléliques 
@@ -514,5 +830,35 @@ les fréquences restent stables.
 # Sidebar Reset
 st.sidebar.divider()
 if st.sidebar.button("🔄 Réinitialiser l'exercice"):
+    arreter_lecture()
     st.session_state.clear()
     st.rerun()
+
+publier_resultats()
+signaler_session()
+
+# Panneau de profilage : seulement pour une session ouverte avec ?profil=1
+profilage.fin_execution()
+prechauffage.noter_premier_affichage(time.perf_counter() - DEBUT_EXECUTION)
+if st.query_params.get("profil") == "1" and profilage.actif():
+    import pandas as pd
+    # Statistiques de toutes les sessions si HARDY_PROFIL=1, sinon de la sienne seulement
+    portee = None if profilage.actif_pour_tous() else profilage.session_courante()
+    with st.sidebar.expander("⏱️ Profilage", expanded=True):
+        derniere = profilage.derniere_execution()
+        if derniere:
+            st.markdown(f"**Dernière exécution : {derniere[profilage.TOTAL] * 1000:.0f} ms**")
+            st.dataframe(pd.DataFrame({"ms": {nom: d * 1000 for nom, d in derniere.items() if nom != profilage.TOTAL}})
+                         .sort_values("ms", ascending=False).round(1), use_container_width=True)
+        effectifs, bornes = profilage.histogramme(session=portee)
+        if len(effectifs):
+            st.markdown(f"**Durée des {effectifs.sum()} dernières exécutions (ms)**")
+            st.bar_chart(pd.Series(effectifs, index=[f"{b:.0f}" for b in bornes[:-1]]))
+            st.dataframe(pd.DataFrame(profilage.resume(portee)).T.sort_values("moyenne_ms", ascending=False).round(1),
+                         use_container_width=True)
+        st.caption("Les réexécutions d'un fragment seul apparaissent au prochain affichage complet de la page.")
+        st.markdown("**Démarrage à froid du serveur (ms)**")
+        st.dataframe(pd.DataFrame({"ms": {nom: d * 1000 for nom, d in prechauffage.rapport().items()}}).round(1),
+                     use_container_width=True)
+        st.download_button("Exporter (JSON)", profilage.exporter_json(portee), "profilage.json", "application/json")
+        st.download_button("Exporter (CSV)", profilage.exporter_csv(portee), "profilage.csv", "text/csv")
@@ -0,0 +1,219 @@
+"""Mesure du temps de réexécution de app.py (et de ce qui le compose).
+
+Le vrai script est piloté sans navigateur par `streamlit.testing.v1.AppTest`.
+Pour chaque scénario on relève le temps (meilleur et médian sur plusieurs
+répétitions, après une exécution de chauffe), le pic de mémoire allouée
+pendant la réexécution (dans une passe à part, non chronométrée) et la
+taille de chaque entrée de `st.session_state`.
+Des micro-mesures isolent la simulation et la construction des graphiques.
+
+Utilisation (depuis la racine du dépôt) :
+    python benchmarks/bench_app.py                 # compare à baseline.json
+    python benchmarks/bench_app.py --enregistrer   # remplace baseline.json
+    python benchmarks/bench_app.py --seuil 2       # régression si > 2 × la référence
+
+Le code de retour vaut 1 si un temps dépasse `seuil` × sa valeur de référence.
+La référence dépend de la machine : l'enregistrer sur le serveur de la classe.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+RACINE = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RACINE))
+
+import numpy as np  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from hardy.engine import simuler  # noqa: E402
+from hardy.graphiques import FigureIncrementale  # noqa: E402
+from hardy.memoire import taille  # noqa: E402
+from hardy.trajectoires import Population, trajectoire  # noqa: E402
+
+APP = RACINE / "app.py"
+REFERENCE = Path(__file__).resolve().parent / "baseline.json"
+# Temps en dessous duquel on ne signale pas de régression (bruit de mesure)
+PLANCHER_S = 0.005
+
+
+# --- SCÉNARIOS APPTEST ---
+def _app(**etat):
+    """AppTest déjà exécuté une fois, avec `etat` injecté dans la session"""
+    at = AppTest.from_file(str(APP), default_timeout=120)
+    for cle, valeur in etat.items():
+        at.session_state[cle] = valeur
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception)
+    return at
+
+
+def _bouton(at, texte):
+    return next(b for b in at.button if texte in b.label)
+
+
+def _etat_etape3(generations):
+    pop = Population(graine=1, tailles=(5000, 10000), p0=0.5, generations=generations,
+                     effectifs0=((1250, 2500, 1250), (2500, 5000, 2500)))
+    return dict(pop_RR=1250, pop_rr=1250, etape2=True, p_initial=0.5, pop_etape3=pop)
+
+
+def scenario_curseur():
+    at = _app()
+    valeurs = iter(np.linspace(0.2, 0.8, 50))
+    return at, lambda: at.slider[0].set_value(round(float(next(valeurs)), 2)).run()
+
+
+def scenario_accelerer(generations):
+    def preparer():
+        at = _app(**_etat_etape3(generations))
+        return at, lambda: _bouton(at, "+10").click().run()
+    return preparer
+
+
+def scenario_simuler_20(taille_pop):
+    def preparer():
+        etat = _etat_etape3(10)
+        etat["show_explication_section"] = True
+        at = _app(**etat)
+        return at, lambda: _bouton(at, f"(N={taille_pop})").click().run()
+    return preparer
+
+
+def scenario_fixer():
+    at = _app(nb_essais=11)
+    at.slider[0].set_value(0.2).run()
+    return at, lambda: _bouton(at, "Fixer ma population").click().run()
+
+
+SCENARIOS = {
+    # AppTest réexécute toute la page, pas le seul fragment de l'étape 2
+    "curseur_etape2_page_complete": scenario_curseur,
+    "accelerer_apres_0": scenario_accelerer(0),
+    "accelerer_apres_100": scenario_accelerer(100),
+    "accelerer_apres_1000": scenario_accelerer(1000),
+    "simuler_20_N500": scenario_simuler_20(500),
+    "simuler_20_N20000": scenario_simuler_20(20000),
+    "appliquer_fix": scenario_fixer,
+}
+
+
+def mesurer_scenario(preparer, repetitions):
+    """Temps, pic mémoire et tailles des entrées de session d'un scénario
+
+    La première exécution (imports, caches vides) n'est pas comptée. Le pic
+    mémoire est relevé dans une passe à part : tracemalloc multiplie le
+    temps d'une réexécution par cinq environ.
+    """
+    temps = []
+    for _ in range(repetitions + 1):
+        at, action = preparer()
+        debut = time.perf_counter()
+        action()
+        temps.append(time.perf_counter() - debut)
+        if at.exception:
+            raise RuntimeError(at.exception)
+    temps = temps[1:]
+
+    at, action = preparer()
+    tracemalloc.start()
+    action()
+    pic = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "temps_s": min(temps),
+        "temps_median_s": statistics.median(temps),
+        "pic_memoire_octets": pic,
+        "session_state_octets": {cle: taille(valeur) for cle, valeur in at.session_state.items()},
+    }
+
+
+# --- MICRO-MESURES ---
+def _chrono(fonction, repetitions):
+    fonction()
+    temps = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        temps.append(time.perf_counter() - debut)
+    return {"temps_s": min(temps), "temps_median_s": statistics.median(temps)}
+
+
+def micro_mesures(repetitions):
+    rng = np.random.default_rng(0)
+    resultats = {
+        "simuler_10_generations": _chrono(lambda: simuler([5000, 10000], 0.5, 10, rng), repetitions),
+        "simuler_1000_generations": _chrono(lambda: simuler([5000, 10000], 0.5, 1000, rng), repetitions),
+        "trajectoire_1000_generations": _chrono(
+            lambda: trajectoire(Population(rng.integers(2**32), (5000, 10000), 0.5, 1000)), repetitions),
+    }
+    # Graines différentes : une même lignée serait prolongée en place dans le cache partagé
+    hist = trajectoire(Population(0, (5000,), 0.5, 1000)).alleles[0]
+    longue = trajectoire(Population(1, (5000,), 0.5, 20000)).alleles[0]
+    couleurs = ["#636efa", "#EF553B"]
+
+    def figure(h):
+        fig = FigureIncrementale(None, ["R (p)", "r (q)"], couleurs, "bench").mettre_a_jour(h)
+        return fig.to_json()
+
+    resultats["figure_1000_generations"] = _chrono(lambda: figure(hist), repetitions)
+    resultats["figure_20000_generations_lttb"] = _chrono(lambda: figure(longue), repetitions)
+    resultats["figure_1000_generations"]["json_octets"] = len(figure(hist))
+    resultats["figure_20000_generations_lttb"]["json_octets"] = len(figure(longue))
+    return resultats
+
+
+# --- COMPARAISON À LA RÉFÉRENCE ---
+def regressions(resultats, reference, seuil):
+    """Liste des mesures plus lentes que `seuil` × la référence (sur le meilleur temps)"""
+    lentes = []
+    for groupe in ("scenarios", "micro"):
+        for nom, mesure in resultats[groupe].items():
+            ref = reference.get(groupe, {}).get(nom)
+            if ref is None:
+                continue
+            if mesure["temps_s"] > max(seuil * ref["temps_s"], PLANCHER_S):
+                lentes.append(f"{groupe}/{nom} : {mesure['temps_s'] * 1000:.1f} ms "
+                              f"(référence {ref['temps_s'] * 1000:.1f} ms)")
+    return lentes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--seuil", type=float, default=1.5,
+                        help="facteur de ralentissement toléré par rapport à la référence")
+    parser.add_argument("--enregistrer", action="store_true", help="écrire les résultats comme nouvelle référence")
+    parser.add_argument("--reference", type=Path, default=REFERENCE)
+    parser.add_argument("--sortie", type=Path, help="écrire aussi les résultats dans ce fichier JSON")
+    args = parser.parse_args(argv)
+
+    resultats = {"scenarios": {}, "micro": micro_mesures(args.repetitions)}
+    for nom, preparer in SCENARIOS.items():
+        resultats["scenarios"][nom] = mesurer_scenario(preparer, args.repetitions)
+        print(f"{nom:28s} {resultats['scenarios'][nom]['temps_s'] * 1000:8.1f} ms")
+    for nom, mesure in resultats["micro"].items():
+        print(f"{nom:28s} {mesure['temps_s'] * 1000:8.1f} ms")
+
+    texte = json.dumps(resultats, indent=2, ensure_ascii=False)
+    if args.sortie:
+        args.sortie.write_text(texte, encoding="utf-8")
+    if args.enregistrer:
+        args.reference.write_text(texte, encoding="utf-8")
+        print(f"Référence enregistrée dans {args.reference}")
+        return 0
+    if not args.reference.exists():
+        print("Pas de référence : lancer avec --enregistrer")
+        return 0
+    lentes = regressions(resultats, json.loads(args.reference.read_text(encoding="utf-8")), args.seuil)
+    for ligne in lentes:
+        print("RÉGRESSION", ligne)
+    return 1 if lentes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+"""Outils de simulation pour l'application « Mission Hardy-Weinberg »."""
+from hardy.engine import GENOTYPES, Forces, frequence_allele, proportions_hw, simuler, simuler_loci
+from hardy.historique import Historique
+from hardy.trajectoires import Population, trajectoire
+
+__all__ = ["Forces", "GENOTYPES", "Historique", "Population", "frequence_allele",
+           "proportions_hw", "simuler", "simuler_loci", "trajectoire"]
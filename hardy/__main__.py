@@ -0,0 +1,5 @@
+import sys
+
+from hardy.cli import main
+
+sys.exit(main())
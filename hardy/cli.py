@@ -0,0 +1,157 @@
+"""Ligne de commande : expériences de dérive en lot, sans l'interface Streamlit.
+
+    python -m hardy simuler --N 500 5000 20000 --generations 1000 --replicats 10000 \
+        --graine 42 --sortie derive.parquet
+
+Les trajectoires sont produites paquet par paquet (`ensemble.iterer_replicats`)
+et écrites au fil de l'eau, au format long (taille, réplicat, génération, p) :
+la mémoire utilisée ne dépend pas du nombre de réplicats. Le format suit
+l'extension du fichier (.parquet, qui demande pyarrow, ou .csv). Le débit
+(générations × réplicats par seconde) est affiché à la fin. --selection,
+--mutation et --migration ajoutent les forces évolutives à la dérive.
+
+    python -m hardy servir [options de streamlit run]
+
+lance l'application après l'avoir préchauffée (`prechauffage`) : imports,
+images et tables théoriques sont prêts avant le premier visiteur.
+`python -m hardy prechauffer` affiche seulement les durées du préchauffage.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from hardy.engine import Forces
+from hardy.ensemble import iterer_replicats
+
+FORMATS = ("parquet", "csv")
+
+
+def tableau_paquet(taille, debut, p):
+    """Paquet (générations + 1, réplicats) mis au format long"""
+    import pandas as pd
+    generations, replicats = p.shape
+    return pd.DataFrame({
+        "taille": np.full(p.size, taille, dtype=np.int32),
+        "replicat": np.tile(np.arange(debut, debut + replicats, dtype=np.int32), generations),
+        "generation": np.repeat(np.arange(generations, dtype=np.int32), replicats),
+        "p": p.ravel(),
+    })
+
+
+def ecrire_csv(paquets, chemin):
+    """Écrit les paquets (taille, début, p) dans un CSV ; renvoie le nombre de lignes"""
+    lignes = 0
+    with open(chemin, "w", newline="", encoding="utf-8") as fichier:
+        for i, paquet in enumerate(paquets):
+            tableau = tableau_paquet(*paquet)
+            tableau.to_csv(fichier, header=i == 0, index=False, float_format="%.6g")
+            lignes += len(tableau)
+    return lignes
+
+
+def ecrire_parquet(paquets, chemin):
+    """Écrit les paquets (taille, début, p) dans un Parquet, un groupe de lignes par paquet"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Le format Parquet demande pyarrow (pip install pyarrow) ; sinon utiliser un .csv")
+    lignes = 0
+    ecrivain = None
+    try:
+        for paquet in paquets:
+            table = pa.Table.from_pandas(tableau_paquet(*paquet), preserve_index=False)
+            if ecrivain is None:
+                ecrivain = pq.ParquetWriter(chemin, table.schema)
+            ecrivain.write_table(table)
+            lignes += table.num_rows
+    finally:
+        if ecrivain is not None:
+            ecrivain.close()
+    return lignes
+
+
+def simuler(args):
+    format_sortie = args.format or args.sortie.suffix.lstrip(".").lower()
+    if format_sortie not in FORMATS:
+        raise SystemExit(f"Format inconnu « {format_sortie} » : choisir parmi {', '.join(FORMATS)}")
+    ecrire = ecrire_parquet if format_sortie == "parquet" else ecrire_csv
+
+    forces = Forces(tuple(args.selection), tuple(args.mutation), *args.migration)
+    debut = time.perf_counter()
+    paquets = iterer_replicats(args.N, args.p0, args.generations, args.replicats, args.graine, args.processus,
+                               forces)
+    lignes = ecrire(paquets, args.sortie)
+    duree = time.perf_counter() - debut
+
+    debit = len(args.N) * args.replicats * args.generations / duree
+    print(f"{len(args.N)} taille(s) × {args.replicats} réplicats × {args.generations} générations "
+          f"en {duree:.2f} s : {debit / 1e6:.1f} M générations·réplicats/s", file=sys.stderr)
+    print(f"{lignes} lignes écrites dans {args.sortie}", file=sys.stderr)
+    return 0
+
+
+def afficher_rapport(rapport):
+    for nom, duree in rapport.items():
+        print(f"{nom:<45} {duree * 1000:8.1f} ms", file=sys.stderr)
+    print(f"{'total':<45} {sum(rapport.values()) * 1000:8.1f} ms", file=sys.stderr)
+
+
+def prechauffer(args):
+    from hardy.prechauffage import prechauffer as lancer_prechauffage
+    afficher_rapport(lancer_prechauffage())
+    return 0
+
+
+def servir(args):
+    """Préchauffe ce processus, puis y démarre le serveur Streamlit (mêmes caches)"""
+    from hardy.prechauffage import prechauffer as lancer_prechauffage
+    from hardy.ressources import chemin
+    afficher_rapport(lancer_prechauffage())
+    from streamlit.web import cli as streamlit_cli
+    return streamlit_cli.main(["run", str(chemin("app.py")), *args.options], prog_name="streamlit")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m hardy", description=__doc__.splitlines()[0])
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    sim = commandes.add_parser("simuler", aliases=["simulate"],
+                               help="simuler des réplicats de Wright-Fisher et écrire leurs trajectoires")
+    sim.add_argument("--N", type=int, nargs="+", required=True, help="taille(s) de population")
+    sim.add_argument("--p0", type=float, default=0.5, help="fréquence initiale de R")
+    sim.add_argument("--generations", type=int, required=True)
+    sim.add_argument("--replicats", "--replicates", type=int, default=10_000)
+    sim.add_argument("--graine", "--seed", type=int, help="graine (même graine = mêmes trajectoires)")
+    sim.add_argument("--sortie", "-o", type=Path, default=Path("derive.parquet"))
+    sim.add_argument("--format", choices=FORMATS, help="par défaut, d'après l'extension de --sortie")
+    sim.add_argument("--processus", type=int,
+                     help="nombre de processus de calcul (par défaut, un par cœur ; 1 : sans pool)")
+    sim.add_argument("--selection", type=float, nargs=3, default=(1.0, 1.0, 1.0),
+                     metavar=("W_RR", "W_Rr", "W_rr"), help="valeurs sélectives des trois génotypes")
+    sim.add_argument("--mutation", type=float, nargs=2, default=(0.0, 0.0), metavar=("U", "V"),
+                     help="taux de mutation R → r et r → R par génération")
+    sim.add_argument("--migration", type=float, nargs=2, default=(0.0, 0.0), metavar=("M", "P_SOURCE"),
+                     help="part d'immigrants par génération et fréquence de R chez eux")
+    sim.set_defaults(fonction=simuler)
+
+    pre = commandes.add_parser("prechauffer", aliases=["warmup"],
+                               help="préchauffer les caches et afficher la durée de chaque étape")
+    pre.set_defaults(fonction=prechauffer)
+
+    srv = commandes.add_parser("servir", aliases=["serve"],
+                               help="lancer l'application (streamlit run app.py) après préchauffage ; "
+                                    "les autres options sont transmises à streamlit run")
+    srv.set_defaults(fonction=servir)
+
+    args, options = parser.parse_known_args(argv)
+    if options and args.fonction is not servir:
+        parser.error(f"arguments inconnus : {' '.join(options)}")
+    args.options = options
+    if args.fonction is simuler and (any(n <= 0 for n in args.N) or args.generations < 0
+                                     or args.replicats <= 0 or not 0 <= args.p0 <= 1):
+        parser.error("N et --replicats doivent être > 0, --generations ≥ 0 et 0 ≤ --p0 ≤ 1")
+    return args.fonction(args)
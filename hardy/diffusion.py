@@ -0,0 +1,98 @@
+"""Approximation de diffusion (Kimura) pour les grandes populations.
+
+Coût en O(générations) quel que soit N :
+- variance exacte de p après t générations : p q (1 - (1 - 1/2N)^t)
+- probabilité de fixation de R avant t (série de Kimura, 1955)
+- temps moyen avant fixation ou perte : -4N (p ln p + q ln q)
+"""
+import numpy as np
+
+from hardy.historique import Historique
+
+COLONNES = ("5 %", "médiane", "95 %")
+# Quantile 95 % de la loi normale centrée réduite
+Z_95 = 1.6448536269514722
+# Termes de la série de Kimura : on les garde tant que i(i+1) t / 4N < SEUIL_SERIE
+# (au-delà, exp(-SEUIL_SERIE) est négligeable), dans la limite de TERMES_MAX
+SEUIL_SERIE = 40
+TERMES_MAX = 20_000
+
+
+def variance(taille, p0, generations):
+    """Variance de p pour les générations 0..G"""
+    t = np.arange(generations + 1)
+    return p0 * (1 - p0) * (1 - (1 - 1 / (2 * taille)) ** t)
+
+
+def enveloppe(taille, p0, generations):
+    """Bande 5 %–95 % de p (approximation normale de la diffusion) : Historique(COLONNES)"""
+    ecart = np.sqrt(variance(taille, p0, generations))
+    valeurs = np.column_stack([np.clip(p0 - Z_95 * ecart, 0, 1),
+                               np.full(generations + 1, p0),
+                               np.clip(p0 + Z_95 * ecart, 0, 1)])
+    hist = Historique(COLONNES, capacite=generations + 1)
+    hist.ajouter(np.arange(generations + 1), valeurs)
+    return hist
+
+
+def _jacobi_11(n_max, x):
+    """Polynômes de Jacobi P_n^(1,1)(x) pour n = 0..n_max (récurrence à trois termes)"""
+    p = np.empty(n_max + 1)
+    p[0] = 1.0
+    if n_max >= 1:
+        p[1] = 2 * x
+    for n in range(2, n_max + 1):
+        p[n] = (n + 1) * ((2 * n + 1) * x * p[n - 1] - n * p[n - 2]) / (n * (n + 2))
+    return p
+
+
+def _termes(taille, t):
+    """Nombre de termes pour que la série de Kimura ait convergé à la génération t (>= 1)"""
+    return int(np.ceil(np.sqrt(SEUIL_SERIE * 4 * taille / t))) + 1
+
+
+def proba_fixation_avant(taille, p0, generations):
+    """Probabilité que R soit fixé (p = 1) à chaque génération 0..G, d'après Kimura
+
+    u(p, t) = p + Σ (2i+1) p q (-1)^i F(1-i, i+2; 2; p) exp(-i(i+1) t / 4N),
+    avec F(1-i, i+2; 2; p) = P_{i-1}^(1,1)(1 - 2p) / i.
+
+    La série converge d'autant plus lentement que t / 4N est petit : les
+    générations sont traitées par tranches [t, 2t), chacune avec le nombre de
+    termes qu'il faut à sa première génération. Au-delà de TERMES_MAX termes
+    (N de plusieurs millions, t de quelques générations), la probabilité
+    renvoyée est 0.
+    """
+    q0 = 1 - p0
+    u = np.empty(generations + 1)
+    u[0] = float(p0 >= 1)
+    if generations == 0:
+        return u
+    termes = min(_termes(taille, 1), TERMES_MAX)
+    i = np.arange(1, termes + 1)
+    coefficients = (2 * i + 1) * p0 * q0 * (-1.0) ** i * _jacobi_11(termes - 1, 1 - 2 * p0) / i
+    debut = 1
+    while debut <= generations:
+        fin = min(2 * debut, generations + 1)
+        n = _termes(taille, debut)
+        t = np.arange(debut, fin)
+        if n > TERMES_MAX:
+            u[debut:fin] = 0.0
+        else:
+            decroissance = np.exp(-np.outer(t, i[:n] * (i[:n] + 1)) / (4 * taille))
+            u[debut:fin] = p0 + decroissance @ coefficients[:n]
+        debut = fin
+    return np.clip(u, 0, 1)
+
+
+def proba_absorption_avant(taille, p0, generations):
+    """Probabilité que R soit fixé OU perdu à chaque génération 0..G"""
+    return (proba_fixation_avant(taille, p0, generations)
+            + proba_fixation_avant(taille, 1 - p0, generations))
+
+
+def temps_moyen_absorption(taille, p0):
+    """Temps moyen (en générations) avant que R soit fixé ou perdu"""
+    if p0 <= 0 or p0 >= 1:
+        return 0.0
+    return -4 * taille * (p0 * np.log(p0) + (1 - p0) * np.log(1 - p0))
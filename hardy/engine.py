@@ -0,0 +1,163 @@
+"""Moteur de simulation de Wright-Fisher (dérive génétique), vectorisé avec NumPy.
+
+Une génération de toutes les populations demandées (plusieurs tailles N,
+éventuellement plusieurs réplicats) consomme exactement deux nombres
+uniformes par population, transformés en effectifs de génotypes par
+inversion de la fonction de répartition binomiale. Le hasard est ainsi
+commun à deux simulations de même graine (« nombres aléatoires communs ») :
+avec ou sans forces évolutives, une population reçoit les mêmes uniformes à
+chaque génération, et l'écart entre les deux courbes ne vient que des forces.
+
+Les autres forces évolutives (sélection, mutation, migration) sont une mise à
+jour déterministe de p, appliquée à toutes les populations d'un coup juste
+avant le tirage : elles ne coûtent que quelques opérations NumPy par
+génération, quel que soit le nombre de réplicats.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+# Ordre des génotypes dans tous les tableaux : (R//R), (R//r), (r//r)
+GENOTYPES = ("RR", "Rr", "rr")
+
+
+def proportions_hw(p):
+    """Proportions de Hardy-Weinberg [p², 2pq, q²] (dernier axe = génotypes)"""
+    p = np.clip(np.asarray(p, dtype=float), 0.0, 1.0)
+    q = 1.0 - p
+    return np.stack([p * p, 2 * p * q, q * q], axis=-1)
+
+
+def _log_factorielles(n):
+    return np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, n + 1)))])
+
+
+def _binomiale_inverse(n, p, u, log_fact):
+    """Plus petit k tel que P(B(n, p) <= k) >= u (n entier, p et u scalaires)
+
+    La loi n'est calculée que sur ± 10 écarts-types autour de la moyenne
+    (la masse au-delà est négligeable), à partir des log-factorielles.
+    """
+    if p <= 0.0 or n == 0:
+        return 0
+    if p >= 1.0:
+        return n
+    ecart = np.sqrt(n * p * (1 - p))
+    bas = max(int(n * p - 10 * ecart) - 1, 0)
+    haut = min(int(n * p + 10 * ecart) + 2, n)
+    k = np.arange(bas, haut + 1)
+    loi = np.exp(log_fact[n] - log_fact[k] - log_fact[n - k] + k * np.log(p) + (n - k) * np.log1p(-p))
+    cumul = np.cumsum(loi)
+    return bas + min(int(np.searchsorted(cumul, u * cumul[-1])), len(k) - 1)
+
+
+def tirer_genotypes(tailles, p, uniformes, log_fact):
+    """Effectifs (RR, Rr, rr) de Hardy-Weinberg pour chaque population, à partir de deux uniformes chacune
+
+    Équivaut au tirage multinomial de N individus selon p², 2pq, q² :
+    RR ~ B(N, p²), puis Rr ~ B(N - RR, 2pq / (1 - p²)).
+    """
+    effectifs = np.empty(tailles.shape + (3,), dtype=np.int64)
+    for i in np.ndindex(tailles.shape):
+        n, x = int(tailles[i]), float(np.clip(p[i], 0.0, 1.0))
+        rr_dom = _binomiale_inverse(n, x * x, uniformes[i + (0,)], log_fact)
+        reste = 1.0 - x * x
+        het = _binomiale_inverse(n - rr_dom, 2 * x * (1 - x) / reste if reste > 0 else 0.0,
+                                 uniformes[i + (1,)], log_fact)
+        effectifs[i] = rr_dom, het, n - rr_dom - het
+    return effectifs
+
+
+def frequence_allele(genotypes, tailles):
+    """Fréquence p de l'allèle R à partir des effectifs (RR, Rr, rr)"""
+    genotypes = np.asarray(genotypes)
+    return (2 * genotypes[..., 0] + genotypes[..., 1]) / (2 * np.asarray(tailles))
+
+
+@dataclass(frozen=True)
+class Forces:
+    """Forces évolutives autres que la dérive, appliquées à chaque génération
+
+    - `fitness` : valeurs sélectives (w_RR, w_Rr, w_rr) ;
+    - `mutation` : taux (u, v) de mutation R → r et r → R par génération ;
+    - `migration` : part m de la génération venant d'une population source
+      de fréquence `p_source`.
+    """
+    fitness: tuple = (1.0, 1.0, 1.0)
+    mutation: tuple = (0.0, 0.0)
+    migration: float = 0.0
+    p_source: float = 0.0
+
+    @property
+    def neutre(self):
+        return self.fitness[0] == self.fitness[1] == self.fitness[2] \
+            and self.mutation == (0.0, 0.0) and self.migration == 0.0
+
+    def appliquer(self, p):
+        """Fréquence de R attendue chez les descendants, avant le tirage (sélection, mutation, migration)"""
+        w_RR, w_Rr, w_rr = self.fitness
+        q = 1.0 - p
+        moyenne = w_RR * p * p + 2 * w_Rr * p * q + w_rr * q * q
+        p = (w_RR * p * p + w_Rr * p * q) / np.where(moyenne > 0, moyenne, 1.0)
+        u, v = self.mutation
+        p = p * (1.0 - u) + (1.0 - p) * v
+        return (1.0 - self.migration) * p + self.migration * self.p_source
+
+
+def sans_effet(forces):
+    """Vrai si `forces` ne change rien (None ou toutes neutres) : on garde alors la dérive seule"""
+    return forces is None or forces.neutre
+
+
+def simuler(tailles, p0, generations, rng=None, forces=None):
+    """Simule `generations` générations pour plusieurs populations à la fois.
+
+    `tailles` (N) et `p0` peuvent être des scalaires ou des tableaux de même
+    forme (ou diffusables) : chaque case est une population indépendante.
+    `forces` (une instance de `Forces`) s'ajoute à la dérive ; à graine
+    égale, la simulation avec forces et celle sans forces partagent leurs
+    nombres aléatoires (voir l'en-tête du module).
+
+    Retourne (genotypes, frequences) :
+    - genotypes : (generations, *forme, 3) effectifs RR / Rr / rr des générations 1..G
+    - frequences : (generations + 1, *forme) fréquence p de R, génération 0 incluse
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    tailles, p = np.broadcast_arrays(np.asarray(tailles, dtype=np.int64),
+                                     np.asarray(p0, dtype=float))
+    forme = tailles.shape
+
+    genotypes = np.empty((generations,) + forme + (3,), dtype=np.int64)
+    frequences = np.empty((generations + 1,) + forme, dtype=float)
+    frequences[0] = np.clip(p, 0.0, 1.0)
+
+    forces = None if sans_effet(forces) else forces
+    log_fact = _log_factorielles(int(tailles.max(initial=0)))
+    for g in range(generations):
+        p = frequences[g] if forces is None else forces.appliquer(frequences[g])
+        genotypes[g] = tirer_genotypes(tailles, p, rng.random(forme + (2,)), log_fact)
+        frequences[g + 1] = frequence_allele(genotypes[g], tailles)
+
+    return genotypes, frequences
+
+
+def simuler_loci(taille, p0, generations, rng=None):
+    """Dérive de k allèles sur L locus indépendants, pour une population de N individus.
+
+    `p0` : fréquences initiales, tableau (L, k) ou (k,) (mêmes fréquences à
+    chaque locus). Chaque génération tire les 2N copies de chaque locus :
+    UN seul tirage multinomial groupé sur le tableau (L, k).
+
+    Retourne les fréquences (generations + 1, L, k) en float32, génération 0 incluse.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    p = np.atleast_2d(np.asarray(p0, dtype=float))
+    p = p / p.sum(axis=-1, keepdims=True)
+    copies = 2 * int(taille)
+
+    frequences = np.empty((generations + 1,) + p.shape, dtype=np.float32)
+    frequences[0] = p
+    for g in range(generations):
+        p = rng.multinomial(copies, p) / copies
+        frequences[g + 1] = p
+    return frequences
@@ -0,0 +1,160 @@
+"""Mode ensemble : des milliers de populations répliquées par taille N.
+
+Le travail est découpé en blocs (taille, paquet de réplicats) exécutés dans un
+pool de processus ; chaque bloc reçoit son propre flux aléatoire issu de
+`SeedSequence.spawn`, le résultat est donc reproductible quel que soit le
+nombre de processus. Chaque bloc ne renvoie qu'un histogramme de p par
+génération : on fusionne les histogrammes pour obtenir la médiane et la
+bande 5 %–95 % sans rapatrier les trajectoires.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from hardy.engine import sans_effet
+from hardy.historique import Historique
+
+QUANTILES = (0.05, 0.5, 0.95)
+COLONNES = ("5 %", "médiane", "95 %")
+# Nombre de classes de l'histogramme de p (résolution 1/1000 au plus)
+RESOLUTION = 1000
+# Réplicats par bloc : le découpage (et donc le résultat) ne dépend pas du nombre de processus
+TAILLE_BLOC = 1250
+# En dessous de ce volume (réplicats × générations), le pool coûte plus qu'il ne rapporte
+SEUIL_POOL = 200_000
+
+# Pools de processus partagés, par nombre de processus
+_pools = {}
+_verrou = threading.Lock()
+
+
+def _executeur(processus):
+    """Pool partagé de `processus` processus, créé au premier besoin"""
+    with _verrou:
+        pool = _pools.get(processus)
+        if pool is None:
+            # forkserver : on ne duplique pas les threads du serveur Streamlit
+            contexte = multiprocessing.get_context("forkserver")
+            pool = _pools[processus] = ProcessPoolExecutor(max_workers=processus, mp_context=contexte)
+            atexit.register(pool.shutdown, cancel_futures=True)
+        return pool
+
+
+def _comptes(taille, p0, generations, replicats, graine, forces=None):
+    """Nombre d'allèles R de chaque réplicat d'un paquet : tableau (générations + 1, réplicats)
+
+    Le nombre d'allèles R de la génération suivante suit une loi binomiale
+    B(2N, p'), ce qui équivaut au tirage multinomial des génotypes de `engine`
+    (p' : p après sélection, mutation et migration s'il y a des `forces`).
+    """
+    rng = np.random.default_rng(graine)
+    forces = None if sans_effet(forces) else forces
+    comptes = np.full(replicats, round(p0 * 2 * taille), dtype=np.int64)
+    resultat = np.empty((generations + 1, replicats), dtype=np.int64)
+    resultat[0] = comptes
+    for g in range(1, generations + 1):
+        p = comptes / (2 * taille)
+        comptes = rng.binomial(2 * taille, p if forces is None else forces.appliquer(p))
+        resultat[g] = comptes
+    return resultat
+
+
+def _frequences(taille, p0, generations, replicats, graine, forces=None):
+    """Fréquence p de chaque réplicat d'un paquet, en float32 (moitié moins à transférer)"""
+    return (_comptes(taille, p0, generations, replicats, graine, forces) / (2 * taille)).astype(np.float32)
+
+
+def _bloc(taille, p0, generations, replicats, graine, forces=None):
+    """Simule un paquet de réplicats et renvoie l'histogramme (générations + 1, classes)"""
+    classes = min(2 * taille, RESOLUTION)
+    indices = _comptes(taille, p0, generations, replicats, graine, forces) * classes // (2 * taille)
+    indices += np.arange(generations + 1)[:, None] * (classes + 1)
+    return np.bincount(indices.ravel(), minlength=(generations + 1) * (classes + 1)) \
+        .reshape(generations + 1, classes + 1)
+
+
+def _quantiles(histogrammes):
+    """Quantiles par génération à partir des histogrammes fusionnés"""
+    classes = histogrammes.shape[1] - 1
+    cumul = np.cumsum(histogrammes, axis=1)
+    total = cumul[:, -1:]
+    resultat = np.empty((len(histogrammes), len(QUANTILES)))
+    for i, q in enumerate(QUANTILES):
+        resultat[:, i] = np.argmax(cumul >= q * total, axis=1) / classes
+    return resultat
+
+
+def _taches(tailles, p0, generations, replicats, graine, forces=None):
+    """Découpage en paquets de TAILLE_BLOC réplicats, chacun avec son flux aléatoire"""
+    paquets = [TAILLE_BLOC] * (replicats // TAILLE_BLOC)
+    if replicats % TAILLE_BLOC:
+        paquets.append(replicats % TAILLE_BLOC)
+    graines = np.random.SeedSequence(graine).spawn(len(tailles) * len(paquets))
+    taches = [(n, p0, generations, r, graines[i * len(paquets) + j], forces)
+              for i, n in enumerate(tailles) for j, r in enumerate(paquets)]
+    return taches, paquets
+
+
+def simuler_ensemble(tailles, p0, generations, replicats=10_000, graine=None, processus=None, forces=None):
+    """Médiane et bande 5 %–95 % de p pour `replicats` populations de chaque taille
+
+    Retourne un dictionnaire {taille: Historique(COLONNES)}. `processus`
+    (par défaut, le nombre de cœurs) fixe la taille du pool ; `processus=1`
+    force le calcul dans le processus courant ; `forces` (engine.Forces)
+    s'ajoute à la dérive.
+    """
+    processus = processus or os.cpu_count() or 1
+    taches, paquets = _taches(tailles, p0, generations, replicats, graine, forces)
+
+    if processus > 1 and replicats * generations * len(tailles) >= SEUIL_POOL:
+        futurs = [_executeur(processus).submit(_bloc, *t) for t in taches]
+        histos = [f.result() for f in futurs]
+    else:
+        histos = [_bloc(*t) for t in taches]
+
+    resultat = {}
+    for i, n in enumerate(tailles):
+        fusion = sum(histos[i * len(paquets):(i + 1) * len(paquets)])
+        hist = Historique(COLONNES, capacite=generations + 1)
+        hist.ajouter(np.arange(generations + 1), _quantiles(fusion))
+        resultat[n] = hist
+    return resultat
+
+
+def iterer_replicats(tailles, p0, generations, replicats=10_000, graine=None, processus=None, forces=None):
+    """Trajectoires complètes des réplicats, paquet par paquet (générateur)
+
+    Produit des triplets (taille, premier réplicat, p) où p est un tableau
+    float32 (générations + 1, réplicats du paquet). Avec la même graine, ce
+    sont exactement les populations résumées par `simuler_ensemble`. Au plus
+    2 × `processus` paquets sont en cours à la fois : la mémoire reste bornée
+    quel que soit le nombre de réplicats demandés.
+    """
+    processus = processus or os.cpu_count() or 1
+    taches, paquets = _taches(tailles, p0, generations, replicats, graine, forces)
+    debuts = np.concatenate([[0], np.cumsum(paquets)[:-1]])
+    reperes = [(n, int(debuts[j])) for n in tailles for j in range(len(paquets))]
+
+    if processus == 1 or replicats * generations * len(tailles) < SEUIL_POOL:
+        for (taille, debut), tache in zip(reperes, taches):
+            yield taille, debut, _frequences(*tache)
+        return
+
+    en_cours = deque()
+    suivantes = iter(zip(reperes, taches))
+    for repere, tache in suivantes:
+        en_cours.append((repere, _executeur(processus).submit(_frequences, *tache)))
+        if len(en_cours) >= 2 * processus:
+            break
+    while en_cours:
+        (taille, debut), futur = en_cours.popleft()
+        p = futur.result()
+        suivante = next(suivantes, None)
+        if suivante is not None:
+            en_cours.append((suivante[0], _executeur(processus).submit(_frequences, *suivante[1])))
+        yield taille, debut, p
@@ -0,0 +1,178 @@
+"""Graphiques des simulations : figures incrémentales et sous-échantillonnage.
+
+Une `FigureIncrementale` est gardée par population : à chaque réexécution on
+n'ajoute que les nouvelles générations aux courbes existantes. Au-delà de
+`POINTS_MAX` points (≈ la largeur d'un graphique à l'écran), les courbes sont
+réduites par l'algorithme LTTB (Largest-Triangle-Three-Buckets) et dessinées
+en WebGL (`Scattergl`) : la taille de la figure envoyée au navigateur reste
+bornée quel que soit le nombre de générations simulées.
+"""
+import numpy as np
+import plotly.graph_objects as go
+
+# Nombre maximal de points par courbe envoyés au navigateur
+POINTS_MAX = 1500
+# Points par paquet au-delà desquels LTTB repasse à la boucle paquet par paquet
+PAQUET_MAX = 16
+
+
+def lttb(x, y, n_sortie):
+    """Indices des `n_sortie` points qui conservent le mieux la forme de la courbe (x, y)
+
+    Sveinn Steinarsson (2013) : premier et dernier points gardés, puis dans chaque
+    paquet le point qui forme le plus grand triangle avec le point retenu
+    précédemment et la moyenne du paquet suivant.
+
+    Le point retenu dans un paquet ne dépend que de celui retenu dans le
+    paquet précédent : on calcule d'un bloc, pour chaque point candidat du
+    paquet précédent, le meilleur point du paquet, puis il ne reste qu'à
+    suivre ces choix (boucle sur des entiers, sans calcul NumPy). Pour de
+    très gros paquets (plus de PAQUET_MAX points), ce calcul coûterait plus
+    que la boucle paquet par paquet.
+    """
+    n = len(x)
+    if n_sortie >= n or n_sortie < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    bords = np.linspace(1, n - 1, n_sortie - 1).astype(np.int64)
+    if n > PAQUET_MAX * n_sortie:
+        return _lttb_boucle(x, y, n_sortie, bords)
+    # Paquets rangés dans une grille (paquets, k), complétée par le dernier point du paquet
+    tailles = np.diff(bords)
+    k = int(tailles.max())
+    grille = bords[:-1, None] + np.minimum(np.arange(k), tailles[:, None] - 1)
+    valide = np.arange(k) < tailles[:, None]
+    gx, gy = x[grille], y[grille]
+    # Moyenne du paquet suivant (le dernier point pour le dernier paquet)
+    mx = np.append((gx * valide).sum(axis=1)[1:] / tailles[1:], x[-1])
+    my = np.append((gy * valide).sum(axis=1)[1:] / tailles[1:], y[-1])
+
+    def meilleurs(ax, ay, paquets):
+        """Meilleur point de chaque paquet pour chaque point retenu possible (ax, ay) : (paquets, candidats)"""
+        ax, ay = ax[..., None], ay[..., None]
+        m_x, m_y = mx[paquets, None, None], my[paquets, None, None]
+        aires = np.abs((ax - m_x) * (gy[paquets, None] - ay) - (ax - gx[paquets, None]) * (m_y - ay))
+        return np.argmax(np.where(valide[paquets, None], aires, -1.0), axis=-1)
+
+    premier = int(meilleurs(x[:1][None], y[:1][None], slice(0, 1))[0, 0])
+    # Par tranches, pour borner la mémoire à paquets × k × k
+    tranche = max(1, (1 << 20) // (k * k))
+    choix = np.concatenate([meilleurs(gx[i - 1:j - 1], gy[i - 1:j - 1], slice(i, j))
+                            for i, j in ((i, min(i + tranche, len(tailles)))
+                                         for i in range(1, len(tailles), tranche))]
+                           or [np.zeros((0, k), dtype=np.int64)])
+    positions = [premier]
+    for ligne in choix.tolist():
+        positions.append(ligne[positions[-1]])
+    indices = np.empty(n_sortie, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    indices[1:-1] = grille[np.arange(len(tailles)), positions]
+    return indices
+
+
+def _lttb_boucle(x, y, n_sortie, bords):
+    """LTTB paquet par paquet (pour les gros paquets)"""
+    n = len(x)
+    indices = np.empty(n_sortie, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_sortie - 2):
+        debut, fin = bords[i], bords[i + 1]
+        suivant = slice(fin, bords[i + 2] if i + 2 < len(bords) else n)
+        mx, my = x[suivant].mean(), y[suivant].mean()
+        aires = np.abs((x[a] - mx) * (y[debut:fin] - y[a]) - (x[a] - x[debut:fin]) * (my - y[a]))
+        a = debut + int(np.argmax(aires))
+        indices[i + 1] = a
+    return indices
+
+
+class FigureIncrementale:
+    """Figure d'une population (une courbe par colonne de l'historique), mise à jour par ajout
+
+    Les deux premières traces sont réservées à l'enveloppe théorique
+    (masquées si on n'en fournit pas), les suivantes aux courbes simulées,
+    puis, si `noms_reference` est donné, aux courbes pointillées d'un second
+    historique de comparaison (ex. la même population sans forces évolutives).
+    """
+
+    def __init__(self, lignee, noms, couleurs, titre, legende="Allèle", points_max=POINTS_MAX,
+                 noms_reference=()):
+        self.lignee = lignee
+        self.noms = list(noms)
+        self.couleurs = list(couleurs)
+        self.noms_reference = list(noms_reference)
+        self.points_max = points_max
+        self.figure = go.Figure(layout=dict(
+            title=titre, xaxis_title="G", yaxis_title="Freq", yaxis_range=[0, 1],
+            legend_title_text=legende,
+        ))
+        self._construire(go.Scatter)
+
+    def _construire(self, type_trace):
+        self._type = type_trace
+        self._n = [0, 0]
+        self._compactions = [0, 0]
+        self.figure.data = []
+        self.figure.add_trace(type_trace(x=[], y=[], mode="lines", line_width=0,
+                                         showlegend=False, hoverinfo="skip", visible=False))
+        self.figure.add_trace(type_trace(x=[], y=[], mode="lines", line_width=0, fill="tonexty",
+                                         name="Enveloppe théorique de p", visible=False))
+        for nom, couleur in zip(self.noms, self.couleurs):
+            self.figure.add_trace(type_trace(x=[], y=[], mode="lines", name=nom, line_color=couleur))
+        for nom, couleur in zip(self.noms_reference, self.couleurs):
+            self.figure.add_trace(type_trace(x=[], y=[], mode="lines", name=nom,
+                                             line=dict(color=couleur, dash="dot")))
+
+    def _synchroniser(self, groupe, traces, hist):
+        """Met les traces à jour d'après `hist` : ajout des nouvelles générations, ou LTTB au-delà de points_max"""
+        n = len(hist)
+        if n == self._n[groupe] and hist.compactions == self._compactions[groupe]:
+            return
+        x, valeurs = hist.generations, hist.valeurs
+        if n > self.points_max:
+            garder = lttb(x, valeurs[:, 0], self.points_max)
+            for j, trace in enumerate(traces):
+                trace.x, trace.y = x[garder], valeurs[garder, j]
+        elif n < self._n[groupe] or hist.compactions != self._compactions[groupe]:
+            # Historique raccourci ou compacté : les lignes déjà tracées ont changé
+            for j, trace in enumerate(traces):
+                trace.x, trace.y = x.copy(), valeurs[:, j].copy()
+        elif n > self._n[groupe]:
+            nouveaux = slice(self._n[groupe], n)
+            for j, trace in enumerate(traces):
+                trace.x = np.concatenate([np.asarray(trace.x, dtype=x.dtype), x[nouveaux]])
+                trace.y = np.concatenate([np.asarray(trace.y, dtype=float), valeurs[nouveaux, j]])
+        self._n[groupe] = n
+        self._compactions[groupe] = hist.compactions
+
+    def octets(self):
+        """Taille des données des courbes (ce qui est envoyé au navigateur à chaque affichage)"""
+        return sum(np.asarray(trace.x).nbytes + np.asarray(trace.y).nbytes
+                   for trace in self.figure.data if trace.x is not None)
+
+    def mettre_a_jour(self, hist, enveloppe=None, couleur_enveloppe="rgba(128, 128, 128, 0.25)", reference=None):
+        """Synchronise la figure avec l'historique `hist` (et `reference`) et renvoie la figure
+
+        Tant que la série tient dans `points_max`, seules les générations
+        nouvelles sont ajoutées ; au-delà, elle est sous-échantillonnée (LTTB).
+        """
+        longueur = max(len(hist), len(reference) if reference is not None else 0)
+        type_trace = go.Scattergl if longueur > self.points_max else go.Scatter
+        if type_trace is not self._type:
+            self._construire(type_trace)
+        k = len(self.noms)
+        self._synchroniser(0, self.figure.data[2:2 + k], hist)
+        if reference is not None and self.noms_reference:
+            self._synchroniser(1, self.figure.data[2 + k:], reference)
+
+        haut, bas = self.figure.data[:2]
+        if enveloppe is None:
+            haut.visible = bas.visible = False
+        else:
+            garder = np.unique(np.linspace(0, len(enveloppe) - 1, min(len(enveloppe), self.points_max))
+                               .astype(np.int64))
+            ex, ev = enveloppe.generations[garder], enveloppe.valeurs[garder]
+            haut.update(x=ex, y=ev[:, 2], visible=True)
+            bas.update(x=ex, y=ev[:, 0], visible=True, fillcolor=couleur_enveloppe)
+        return self.figure
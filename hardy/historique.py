@@ -0,0 +1,119 @@
+"""Stockage colonnaire de l'historique d'une simulation.
+
+Remplace les listes de dictionnaires de `st.session_state` : une ligne par
+génération, une colonne par allèle / génotype, dans un tableau NumPy
+pré-alloué qui double de taille quand il est plein. `compacter` borne le
+nombre de lignes gardées en résumant les générations les plus anciennes.
+"""
+import numpy as np
+
+
+class Historique:
+    """Historique d'une population : générations × séries (allèles ou génotypes)"""
+
+    def __init__(self, colonnes, dtype=float, capacite=64):
+        self.colonnes = tuple(colonnes)
+        self._valeurs = np.empty((capacite, len(self.colonnes)), dtype=dtype)
+        self._generations = np.empty(capacite, dtype=np.int64)
+        self._n = 0
+        # Nombre de compactages : les lignes déjà lues ont pu changer depuis
+        self.compactions = 0
+        self._pas = 1
+        # Lignes de tête qui résument chacune un bloc de `_pas` générations
+        self._resumees = 0
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def generations(self):
+        """Index des générations enregistrées (vue, sans copie)"""
+        return self._generations[:self._n]
+
+    @property
+    def valeurs(self):
+        """Tableau (générations, colonnes) des valeurs enregistrées (vue, sans copie)"""
+        return self._valeurs[:self._n]
+
+    @property
+    def octets(self):
+        """Mémoire des tableaux (capacité réservée comprise)"""
+        return self._valeurs.nbytes + self._generations.nbytes
+
+    def derniere(self):
+        """Dernière ligne enregistrée"""
+        return self._valeurs[self._n - 1]
+
+    def ajouter(self, generations, valeurs):
+        """Ajoute un bloc de lignes : `generations` (n,) et `valeurs` (n, colonnes)"""
+        generations = np.atleast_1d(generations)
+        valeurs = np.asarray(valeurs).reshape(len(generations), len(self.colonnes))
+        fin = self._n + len(generations)
+        if fin > len(self._generations):
+            self._agrandir(fin)
+        self._generations[self._n:fin] = generations
+        self._valeurs[self._n:fin] = valeurs
+        self._n = fin
+
+    def compacter(self, lignes_max):
+        """Ramène l'historique à au plus `lignes_max` lignes (renvoie True s'il a changé)
+
+        Les `lignes_max` // 2 générations les plus récentes restent intactes.
+        Les plus anciennes sont résumées par blocs de `pas` générations
+        (puissance de 2, blocs alignés sur ses multiples) : chaque bloc garde
+        la moyenne exacte de ses générations, pondérée par leur durée, et est
+        repéré par sa première génération. Le dernier bloc, coupé là où
+        commencent les générations intactes, peut être partiel : sa durée
+        (jusqu'à la ligne suivante) le fait compter pour ce qu'il résume au
+        compactage suivant. Le passé est ainsi résumé avec une résolution
+        uniforme, sur au plus `lignes_max` // 4 + 1 blocs.
+        """
+        if self._n <= lignes_max:
+            return False
+        g = self.generations
+        k = self._n - lignes_max // 2
+        limite = g[k]
+        pas = self._pas
+        while limite // pas - g[0] // pas > max(lignes_max // 4, 1):
+            pas *= 2
+        durees = np.diff(g[:k + 1]).astype(float)
+        blocs = g[:k] // pas - g[0] // pas
+        poids = np.bincount(blocs, weights=durees)
+        presents = poids > 0
+        moyennes = np.column_stack([np.bincount(blocs, weights=durees * self._valeurs[:k, c])[presents]
+                                    for c in range(len(self.colonnes))]) / poids[presents, None]
+        if self._valeurs.dtype.kind in "iu":
+            moyennes = np.rint(moyennes)
+        m = len(moyennes)
+        reste = self._n - k
+        self._valeurs[m:m + reste] = self._valeurs[k:self._n]
+        self._generations[m:m + reste] = self._generations[k:self._n]
+        self._valeurs[:m] = moyennes
+        self._generations[:m] = (np.flatnonzero(presents) + g[0] // pas) * pas
+        self._n = m + reste
+        self._pas = pas
+        self._resumees = m
+        self.compactions += 1
+        return True
+
+    def extrait(self, generation):
+        """Copie des lignes jusqu'à `generation` incluse, ou None si elle tombe dans le passé résumé
+
+        La copie ne partage aucune mémoire avec l'historique : elle reste
+        valable pendant qu'un autre fil le prolonge ou le compacte.
+        """
+        if self._resumees and generation < self._generations[self._resumees]:
+            return None
+        fin = int(np.searchsorted(self.generations, generation, side="right"))
+        copie = Historique(self.colonnes, dtype=self._valeurs.dtype, capacite=max(fin, 1))
+        copie.ajouter(self._generations[:fin], self._valeurs[:fin])
+        copie.compactions, copie._pas, copie._resumees = self.compactions, self._pas, self._resumees
+        return copie
+
+    def _agrandir(self, minimum):
+        capacite = max(minimum, 2 * len(self._generations))
+        valeurs = np.empty((capacite, len(self.colonnes)), dtype=self._valeurs.dtype)
+        generations = np.empty(capacite, dtype=np.int64)
+        valeurs[:self._n] = self.valeurs
+        generations[:self._n] = self.generations
+        self._valeurs, self._generations = valeurs, generations
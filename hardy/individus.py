@@ -0,0 +1,106 @@
+"""Simulation individu par individu : de vrais accouplements au hasard.
+
+Chaque oiseau est un octet (uint8) : son nombre d'allèles R (2 = R//R,
+1 = R//r, 0 = r//r). À chaque génération :
+- les oiseaux, dans un ordre aléatoire, sont appariés deux à deux en couples
+  (si N est impair, le dernier oiseau forme seul un « couple » et s'autoféconde) ;
+- chaque descendant choisit un couple au hasard, avec une probabilité
+  proportionnelle à son nombre d'oiseaux (chaque oiseau a la même
+  descendance attendue), et reçoit un allèle de chaque parent (un
+  hétérozygote transmet R une fois sur deux).
+
+La population initiale est mélangée une fois (permutation aléatoire sur
+place). Ensuite, les descendants naissent dans un ordre sans lien avec leur
+génotype : les apparier côte à côte forme déjà des couples au hasard, ce qui
+évite une permutation coûteuse à chaque génération.
+
+Tous les tableaux de travail sont alloués une fois pour toutes ; parents et
+descendants alternent entre deux tampons (double tampon), si bien qu'une
+génération n'alloue aucune mémoire proportionnelle à N.
+"""
+import numpy as np
+
+
+class PopulationIndividus:
+    """Population de N oiseaux simulés individuellement"""
+
+    def __init__(self, effectifs, rng=None):
+        nb_RR, nb_Rr, nb_rr = (int(n) for n in effectifs)
+        self.taille = nb_RR + nb_Rr + nb_rr
+        self._rng = np.random.default_rng() if rng is None else rng
+
+        self._parents = np.zeros(self.taille, dtype=np.uint8)
+        self._parents[:nb_RR] = 2
+        self._parents[nb_RR:nb_RR + nb_Rr] = 1
+        self._rng.shuffle(self._parents)
+        self._enfants = np.empty_like(self._parents)
+        self._allele = np.empty_like(self._parents)
+        # float64 : un float32 n'a que 2^24 valeurs, trop peu pour choisir parmi des millions de couples
+        self._tirage = np.empty(self.taille)
+        # np.take travaille en intp : des indices d'un autre type seraient recopiés
+        self._indices = np.empty(self.taille, dtype=np.intp)
+        self._bits = np.empty(self.taille, dtype=bool)
+
+    def effectifs(self):
+        """Effectifs (RR, Rr, rr) de la génération courante"""
+        return np.bincount(self._parents, minlength=3)[::-1]
+
+    def frequence(self):
+        """Fréquence p de l'allèle R dans la génération courante"""
+        return self._parents.sum(dtype=np.int64) / (2 * self.taille)
+
+    def _transmettre(self, sortie):
+        """Remplace chaque génotype parental de `sortie` par l'allèle transmis (0 ou 1)
+
+        (g + b) >> 1 vaut 1 si g = 2, 0 si g = 0 et b (pile ou face) si g = 1.
+        """
+        self._rng.random(out=self._tirage)
+        np.less(self._tirage, 0.5, out=self._bits)
+        np.add(sortie, self._bits.view(np.uint8), out=sortie)
+        np.right_shift(sortie, 1, out=sortie)
+
+    def generation(self):
+        """Produit la génération suivante par accouplements aléatoires"""
+        parents = self._parents
+
+        # Un oiseau tiré au hasard, puis son couple (2c, 2c + 1) : un couple est
+        # choisi deux fois plus souvent que l'oiseau seul d'un N impair
+        # (l'arrondi du produit peut atteindre N)
+        self._rng.random(out=self._tirage)
+        np.multiply(self._tirage, self.taille, out=self._tirage)
+        np.copyto(self._indices, self._tirage, casting="unsafe")
+        np.minimum(self._indices, self.taille - 1, out=self._indices)
+        np.bitwise_and(self._indices, ~1, out=self._indices)
+
+        # Allèle transmis par le premier parent, puis par le second
+        # (mode="clip" : pas de tampon intermédiaire, et le second parent de
+        # l'oiseau seul d'un N impair est lui-même)
+        np.take(parents, self._indices, out=self._enfants, mode="clip")
+        self._transmettre(self._enfants)
+        np.add(self._indices, 1, out=self._indices)
+        np.take(parents, self._indices, out=self._allele, mode="clip")
+        self._transmettre(self._allele)
+        np.add(self._enfants, self._allele, out=self._enfants)
+
+        self._parents, self._enfants = self._enfants, self._parents
+
+    def simuler(self, generations):
+        """Simule `generations` générations ; mêmes sorties que `engine.simuler` pour une population
+
+        Retourne (genotypes (G, 3), frequences (G + 1,)).
+        """
+        genotypes = np.empty((generations, 3), dtype=np.int64)
+        frequences = np.empty(generations + 1)
+        frequences[0] = self.frequence()
+        for g in range(generations):
+            self.generation()
+            genotypes[g] = self.effectifs()
+            frequences[g + 1] = (2 * genotypes[g, 0] + genotypes[g, 1]) / (2 * self.taille)
+        return genotypes, frequences
+
+
+def effectifs_hw(taille, p):
+    """Effectifs (RR, Rr, rr) entiers proches des proportions de Hardy-Weinberg"""
+    nb_RR = int(round(taille * p * p))
+    nb_rr = int(round(taille * (1 - p) ** 2))
+    return nb_RR, taille - nb_RR - nb_rr, nb_rr
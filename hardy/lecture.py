@@ -0,0 +1,97 @@
+"""Lecture automatique : les générations défilent sans clic.
+
+Un fil de calcul par session prolonge la population à la vitesse demandée
+(les générations sont calculées dans le cache de `trajectoire()`) et dépose
+chaque étape dans une file bornée ; l'affichage (un fragment réexécuté à
+chaque nouvelle étape, IMAGES_PAR_SECONDE fois par seconde au plus) vide la
+file sans attendre et ne redessine que la dernière étape. Calcul et affichage sont découplés : si
+l'affichage prend du retard, la file se remplit et le fil de calcul s'arrête
+au lieu de consommer du processeur ; sans affichage pendant ABANDON secondes
+(onglet fermé), il se termine.
+
+Après une pause, la population rejouée à partir de sa graine donne
+exactement les mêmes courbes.
+"""
+import queue
+import threading
+import time
+
+from hardy.trajectoires import trajectoire
+
+IMAGES_PAR_SECONDE = 10
+VITESSES = (1, 5, 20, 50)
+# Au-delà, la lecture s'arrête d'elle-même
+LECTURE_MAX = 2000
+# Secondes de générations d'avance au plus dans la file
+AVANCE_MAX = 2
+# Secondes d'attente d'une place dans la file avant que le fil de calcul abandonne
+ABANDON = 30
+
+
+class Lecteur:
+    """Fil de calcul qui fait avancer `population` de `vitesse` générations par seconde"""
+
+    def __init__(self, population, vitesse, limite=LECTURE_MAX):
+        self.population = population
+        self.vitesse = vitesse
+        self.limite = limite
+        # Étapes d'une image au plus : le calcul suit le rythme de l'affichage
+        self._paquet = max(1, vitesse // IMAGES_PAR_SECONDE)
+        # Secondes entre deux étapes déposées : une image plus fréquente n'aurait rien de neuf
+        self.periode = max(1 / IMAGES_PAR_SECONDE, self._paquet / vitesse)
+        self._file = queue.Queue(maxsize=max(1, AVANCE_MAX * vitesse // self._paquet))
+        self._stop = threading.Event()
+        self.termine = False
+        self.abandonne = False
+        # Dernière population remise à l'affichage
+        self.derniere = population
+        self._fil = threading.Thread(target=self._produire, name="hardy-lecture", daemon=True)
+        self._fil.start()
+
+    def _produire(self):
+        pop = self.population
+        prochain = time.monotonic()
+        while not self._stop.is_set() and pop.generations < self.limite:
+            n = min(self._paquet, self.limite - pop.generations)
+            pop = pop.avancer(n)
+            trajectoire(pop)
+            self._deposer(pop)
+            prochain += n / self.vitesse
+            self._stop.wait(max(prochain - time.monotonic(), 0))
+        # Marque de fin (la limite est atteinte)
+        self._deposer(None)
+
+    def _deposer(self, paquet):
+        """Attend une place dans la file, sauf si on a demandé l'arrêt ou si personne ne la vide plus"""
+        debut = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self._file.put(paquet, timeout=0.1)
+                return
+            except queue.Full:
+                if time.monotonic() - debut > ABANDON:
+                    self.abandonne = True
+                    self._stop.set()
+
+    def recuperer(self):
+        """Population la plus avancée parmi celles en file (sans attendre), ou None si rien de neuf
+
+        `termine` devient vrai quand la limite est atteinte.
+        """
+        derniere = None
+        while True:
+            try:
+                pop = self._file.get_nowait()
+            except queue.Empty:
+                break
+            if pop is None:
+                self.termine = True
+                break
+            derniere = pop
+        if derniere is not None:
+            self.derniere = derniere
+        return derniere
+
+    def arreter(self):
+        self._stop.set()
+        self._fil.join(timeout=1)
@@ -0,0 +1,42 @@
+"""Plusieurs locus, plusieurs allèles : résumé de la dérive sur L locus indépendants.
+
+La simulation complète (`engine.simuler_loci`) pèse (G + 1) × L × k valeurs ;
+on n'en garde que, pour chaque génération, l'histogramme des fréquences de
+chaque allèle à travers les locus et la part de locus fixés. C'est ce résumé,
+de taille indépendante de L, qui est mis en cache et affiché.
+"""
+import numpy as np
+
+from hardy.engine import simuler_loci
+
+# Nombre de classes des histogrammes sur [0, 1]
+CLASSES = 20
+
+
+def frequences_initiales(alleles):
+    """Allèles équiprobables : (1/k, ..., 1/k)"""
+    return np.full(alleles, 1 / alleles)
+
+
+def histogrammes(frequences, classes=CLASSES):
+    """Nombre de locus par classe de fréquence : tableau (générations + 1, k, classes)
+
+    La dernière classe contient p = 1 (allèle fixé).
+    """
+    generations, loci, alleles = frequences.shape
+    indices = np.minimum((frequences * classes).astype(np.int64), classes - 1)
+    indices += (np.arange(generations * alleles).reshape(generations, 1, alleles)) * classes
+    return np.bincount(indices.ravel(), minlength=generations * alleles * classes) \
+        .reshape(generations, alleles, classes)
+
+
+def part_fixee(frequences):
+    """Part des locus où un allèle est fixé (tous les autres perdus), par génération"""
+    return (frequences.max(axis=-1) == 1).mean(axis=-1)
+
+
+def resumer(taille, loci, alleles, generations, graine=None, classes=CLASSES):
+    """Simule L locus à k allèles et renvoie (histogrammes, part_fixee)"""
+    p0 = np.tile(frequences_initiales(alleles), (loci, 1))
+    frequences = simuler_loci(taille, p0, generations, np.random.default_rng(graine))
+    return histogrammes(frequences, classes), part_fixee(frequences)
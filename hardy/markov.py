@@ -0,0 +1,137 @@
+"""Calcul exact de la dérive pour les petites populations (chaîne de Markov).
+
+Le nombre d'allèles R d'une population de N individus est une chaîne de
+Markov à 2N + 1 états : de i allèles, la génération suivante en compte
+k ~ B(2N, i / 2N). On stocke seulement la bande utile de la matrice de
+transition (les probabilités binomiales négligeables sont coupées) et on
+propage la loi complète de p de génération en génération.
+"""
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from hardy.historique import Historique
+
+QUANTILES = (0.05, 0.5, 0.95)
+COLONNES = ("5 %", "médiane", "95 %")
+# Au-delà de cette taille, la chaîne exacte devient trop coûteuse (voir diffusion)
+TAILLE_MAX = 1000
+# Probabilités de transition négligées
+SEUIL = 1e-13
+
+
+def _log_factorielles(n):
+    return np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, n + 1)))])
+
+
+class OperateurDerive:
+    """Matrice de transition exacte (en bande) de la chaîne de Wright-Fisher pour une taille N
+
+    La bande est rangée « par colonne d'arrivée » : `bande[k, m]` est la
+    probabilité de passer de l'état i = k + m - h à l'état k. Le produit
+    vecteur × matrice devient alors un produit ligne à ligne avec une fenêtre
+    glissante du vecteur, sans copie ni dispersion d'indices.
+    """
+
+    def __init__(self, taille):
+        if taille > TAILLE_MAX:
+            raise ValueError(f"Chaîne exacte limitée à N <= {TAILLE_MAX} (N={taille})")
+        self.taille = taille
+        self.etats = 2 * taille + 1
+        n = 2 * taille
+
+        # Demi-largeur de bande : au plus ~8 écarts-types de la binomiale (p = 1/2)
+        self.demi_largeur = h = min(n, int(np.ceil(8 * np.sqrt(n / 4))) + 2)
+        k = np.arange(self.etats)[:, None]
+        i = k + np.arange(2 * h + 1)[None, :] - h
+        valide = (i >= 0) & (i <= n)
+        ic = np.clip(i, 0, n)
+
+        lf = _log_factorielles(n)
+        p = ic / n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_pmf = (lf[n] - lf[k] - lf[n - k]
+                       + np.where(k > 0, k * np.log(p), 0.0)
+                       + np.where(k < n, (n - k) * np.log1p(-p), 0.0))
+        bande = np.where(valide, np.exp(log_pmf), 0.0)
+        bande[bande < SEUIL] = 0.0
+        # Chaque ligne de la matrice (état de départ i) doit sommer à 1
+        totaux = np.bincount(ic[valide], weights=bande[valide], minlength=self.etats)
+        bande /= np.where(valide, totaux[ic], 1.0)
+
+        self.bande = bande
+        self._absorption = None
+
+    def distribution_initiale(self, p0):
+        """Loi de Dirac sur l'état le plus proche de p0"""
+        x = np.zeros(self.etats)
+        x[int(round(p0 * (self.etats - 1)))] = 1.0
+        return x
+
+    def etape(self, x):
+        """Loi de la génération suivante : produit vecteur × matrice en bande
+
+        Seuls les états atteignables depuis le support de la loi courante sont calculés.
+        """
+        h = self.demi_largeur
+        support = np.flatnonzero(x > SEUIL)
+        lo, hi = max(support[0] - h, 0), min(support[-1] + h + 1, self.etats)
+        tampon = np.zeros(self.etats + 2 * h)
+        tampon[h:h + self.etats] = x
+        fenetres = sliding_window_view(tampon, 2 * h + 1)[lo:hi]
+        y = np.zeros(self.etats)
+        y[lo:hi] = np.einsum("km,km->k", fenetres, self.bande[lo:hi])
+        return y
+
+    def propager(self, p0, generations):
+        """Lois de p pour les générations 0..G : tableau (G + 1, 2N + 1)"""
+        lois = np.empty((generations + 1, self.etats))
+        lois[0] = self.distribution_initiale(p0)
+        for g in range(generations):
+            lois[g + 1] = self.etape(lois[g])
+        return lois
+
+    def absorption(self):
+        """Probabilité de fixation de R et temps moyen avant fixation/perte, pour chaque état
+
+        Résolution (une seule fois) du système (I - Q) t = 1 sur les états transitoires.
+        """
+        if self._absorption is None:
+            s = self.etats
+            dense = np.zeros((s, s))
+            k = np.repeat(np.arange(s), self.bande.shape[1])
+            i = k + np.tile(np.arange(self.bande.shape[1]), s) - self.demi_largeur
+            garder = (i >= 0) & (i < s)
+            dense[i[garder], k[garder]] = self.bande.ravel()[garder]
+
+            q = np.eye(s - 2) - dense[1:-1, 1:-1]
+            solutions = np.linalg.solve(q, np.column_stack([dense[1:-1, -1], np.ones(s - 2)]))
+            fixation = np.concatenate([[0.0], solutions[:, 0], [1.0]])
+            temps = np.concatenate([[0.0], solutions[:, 1], [0.0]])
+            self._absorption = (fixation, temps)
+        return self._absorption
+
+    def fixation(self, p0):
+        """(probabilité de fixation de R, temps moyen avant fixation ou perte) depuis p0"""
+        fixation, temps = self.absorption()
+        etat = int(round(p0 * (self.etats - 1)))
+        return fixation[etat], temps[etat]
+
+
+@lru_cache(maxsize=4)
+def operateur_derive(taille):
+    """Opérateur de N, construit une fois par processus (absorption résolue comprise)"""
+    resultat = OperateurDerive(taille)
+    resultat.absorption()
+    return resultat
+
+
+def quantiles_exacts(operateur, p0, generations):
+    """Médiane et bande 5 %–95 % exactes de p : Historique(COLONNES), comme le mode ensemble"""
+    lois = operateur.propager(p0, generations)
+    cumul = np.cumsum(lois, axis=1)
+    valeurs = np.column_stack([np.argmax(cumul >= q - 1e-12, axis=1) for q in QUANTILES])
+    hist = Historique(COLONNES, capacite=generations + 1)
+    hist.ajouter(np.arange(generations + 1), valeurs / (operateur.etats - 1))
+    return hist
@@ -0,0 +1,36 @@
+"""Estimation de la mémoire occupée par un objet Python (et ce qu'il référence)."""
+import sys
+
+import numpy as np
+
+
+def taille(obj, _vus=None):
+    """Taille approximative en octets de `obj` et des objets qu'il contient
+
+    Chaque objet n'est compté qu'une fois ; pour un tableau NumPy on compte
+    son tampon de données (celui du tableau de base pour une vue).
+    """
+    vus = set() if _vus is None else _vus
+    if id(obj) in vus:
+        return 0
+    vus.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        if obj.base is not None:
+            return sys.getsizeof(obj) + taille(obj.base, vus)
+        return sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return sys.getsizeof(obj)
+
+    total = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        total += sum(taille(k, vus) + taille(v, vus) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        total += sum(taille(v, vus) for v in obj)
+    else:
+        if hasattr(obj, "__dict__"):
+            total += taille(vars(obj), vus)
+        for nom in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, nom):
+                total += taille(getattr(obj, nom), vus)
+    return total
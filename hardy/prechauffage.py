@@ -0,0 +1,75 @@
+"""Démarrage à froid : préchauffage avant la première visite et rapport de durées.
+
+Après le lancement d'un conteneur, le premier visiteur paie les imports
+(pandas, Plotly), la réduction des images et la construction des tables
+théoriques. `python -m hardy servir` appelle `prechauffer()` avant d'ouvrir
+le serveur : les caches du processus (`lru_cache` de `ressources`,
+`statistiques` et `markov`) sont remplis avant la première requête, et les
+`st.cache_resource` de app.py n'ont plus qu'à les lire.
+
+app.py note la durée de ses imports et de son premier affichage ; `rapport()`
+réunit ces mesures et celles du préchauffage.
+"""
+import importlib
+import sys
+import time
+
+from hardy import markov, ressources, statistiques
+
+# Modules lourds (app.py n'importe pandas qu'au besoin)
+MODULES = ("numpy", "pandas", "streamlit", "plotly.graph_objects")
+# Images de l'introduction, à leur largeur d'affichage, et vidéo de conclusion
+IMAGES = (("bleu.png", 100), ("magenta.png", 100), ("vert.png", 100))
+VIDEO = "conclusion.mp4"
+# Effectif de l'étape 2 (table du curseur) et tailles à chaîne exacte de l'étape 4
+EFFECTIF = 5000
+TAILLES_EXACTES = (500,)
+
+_rapport = {}
+
+
+def _noter(nom, duree, remplacer=True):
+    if remplacer or nom not in _rapport:
+        _rapport[nom] = duree
+
+
+def _etape(nom, fonction, *args):
+    debut = time.perf_counter()
+    fonction(*args)
+    _noter(f"préchauffage : {nom}", time.perf_counter() - debut)
+
+
+def _premiere_figure():
+    """Une figure Plotly construite et sérialisée charge les validateurs (chargés à la demande)"""
+    go = importlib.import_module("plotly.graph_objects")
+    go.Figure(go.Scatter(x=[0, 1], y=[0, 1])).to_json()
+
+
+def prechauffer():
+    """Importe les modules lourds et remplit les caches du processus ; renvoie le rapport"""
+    for module in MODULES:
+        _etape(f"import {module}", importlib.import_module, module)
+    _etape("première figure", _premiere_figure)
+    _etape("images", lambda: [ressources.vignette(nom, largeur) for nom, largeur in IMAGES])
+    _etape("vidéo", ressources.lire, VIDEO)
+    _etape("table du curseur", statistiques.effectifs_theoriques, EFFECTIF)
+    _etape("opérateurs exacts", lambda: [markov.operateur_derive(taille) for taille in TAILLES_EXACTES])
+    return rapport()
+
+
+def noter_imports(duree):
+    """Durée des imports de app.py (seule la première exécution du processus est gardée)"""
+    _noter("app.py : imports", duree, remplacer=False)
+
+
+def noter_premier_affichage(duree):
+    """Durée de la première exécution complète de app.py dans ce processus (écrite aussi dans le journal)"""
+    if "app.py : premier affichage" not in _rapport:
+        _noter("app.py : premier affichage", duree)
+        print(f"Premier affichage en {duree:.2f} s (imports : {_rapport.get('app.py : imports', 0):.2f} s)",
+              file=sys.stderr)
+
+
+def rapport():
+    """{mesure: secondes}, dans l'ordre où elles ont été prises"""
+    return dict(_rapport)
@@ -0,0 +1,222 @@
+"""Mesure optionnelle du temps passé dans chaque partie de app.py.
+
+Désactivé par défaut : `chrono()` renvoie alors un contexte vide partagé, le
+coût se limite à un appel de fonction. On l'active pour tout le processus
+avec la variable d'environnement HARDY_PROFIL=1 ou, depuis le navigateur,
+pour sa seule session avec le paramètre d'URL ?profil=1 (?profil=0 l'arrête).
+
+Chaque exécution du script (ou d'un fragment) donne une ligne : durée totale
+et durée de chaque bloc mesuré. Les dernières exécutions sont gardées dans un
+tampon circulaire partagé par toutes les sessions, d'où l'on tire les
+statistiques agrégées et les exports JSON / CSV.
+"""
+import contextlib
+import csv
+import functools
+import io
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+
+# Nombre d'exécutions gardées pour les statistiques
+HISTORIQUE = 500
+TOTAL = "total"
+
+_actif = os.environ.get("HARDY_PROFIL", "") not in ("", "0")
+# Sessions qui ont demandé les mesures pour elles seules (?profil=1)
+_sessions_actives = set()
+_executions = deque(maxlen=HISTORIQUE)
+_verrou = threading.Lock()
+_local = threading.local()
+_RIEN = contextlib.nullcontext()
+
+
+def actif():
+    """Vrai si les mesures sont actives pour la session courante"""
+    return _actif or (bool(_sessions_actives) and _session() in _sessions_actives)
+
+
+def actif_pour_tous():
+    """Vrai si les mesures sont actives pour tout le processus (HARDY_PROFIL=1)"""
+    return _actif
+
+
+def activer(valeur=True):
+    """Active (ou coupe) les mesures pour tout le processus"""
+    global _actif
+    _actif = valeur
+
+
+def activer_session(valeur=True):
+    """Active (ou coupe) les mesures pour la seule session courante"""
+    session = _session()
+    with _verrou:
+        if valeur:
+            _sessions_actives.add(session)
+        else:
+            _sessions_actives.discard(session)
+
+
+def _session():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+class _Execution:
+    def __init__(self, type_execution):
+        self.type = type_execution
+        self.session = _session()
+        self.debut = time.perf_counter()
+        self.horodatage = time.time()
+        self.durees = defaultdict(float)
+        self.section = None
+        self.debut_section = self.debut
+
+    def fermer_section(self):
+        maintenant = time.perf_counter()
+        if self.section is not None:
+            self.durees[self.section] += maintenant - self.debut_section
+        self.debut_section = maintenant
+
+
+def debut_execution():
+    """À appeler en tête de script : ouvre la mesure d'une exécution complète de la page"""
+    if not actif():
+        return
+    if getattr(_local, "execution", None) is not None:
+        # Exécution précédente interrompue (st.rerun, exception) : on la garde telle quelle
+        fin_execution()
+    _local.execution = _Execution("page")
+
+
+def fin_execution():
+    """À appeler en fin de script : enregistre l'exécution en cours"""
+    execution = getattr(_local, "execution", None)
+    if execution is None:
+        return
+    _local.execution = None
+    execution.fermer_section()
+    execution.durees[TOTAL] = time.perf_counter() - execution.debut
+    with _verrou:
+        _executions.append(execution)
+
+
+class _Chrono:
+    __slots__ = ("nom", "debut", "ouvre")
+
+    def __init__(self, nom):
+        self.nom = nom
+
+    def __enter__(self):
+        # Hors d'une exécution de page (réexécution d'un fragment) : on en ouvre une
+        self.ouvre = getattr(_local, "execution", None) is None
+        if self.ouvre:
+            _local.execution = _Execution("fragment")
+        self.debut = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        execution = _local.execution
+        if execution is not None:
+            execution.durees[self.nom] += time.perf_counter() - self.debut
+        if self.ouvre:
+            fin_execution()
+        return False
+
+
+def chrono(nom):
+    """Contexte qui ajoute sa durée au bloc `nom` de l'exécution en cours"""
+    return _Chrono(nom) if actif() else _RIEN
+
+
+def mesure(nom):
+    """Décorateur : chaque appel de la fonction est compté dans le bloc `nom`"""
+    def decorateur(fonction):
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            if not actif():
+                return fonction(*args, **kwargs)
+            with _Chrono(nom):
+                return fonction(*args, **kwargs)
+        return enveloppe
+    return decorateur
+
+
+def section(nom):
+    """Marque le début de la section `nom` du script (la précédente s'arrête là)
+
+    Évite d'indenter tout le script dans des `with` : une section court
+    jusqu'au marqueur suivant ou jusqu'à `fin_execution()`.
+    """
+    execution = getattr(_local, "execution", None)
+    if execution is None:
+        return
+    execution.fermer_section()
+    execution.section = nom
+
+
+def executions(session=None):
+    """Copie des exécutions mesurées (toutes, ou celles d'une session)"""
+    with _verrou:
+        liste = list(_executions)
+    return [e for e in liste if session is None or e.session == session]
+
+
+def session_courante():
+    """Identifiant Streamlit de la session courante (None hors de Streamlit)"""
+    return _session()
+
+
+def derniere_execution(session=None):
+    """Durées (en secondes) de la dernière exécution complète de la page (session courante par défaut)"""
+    for execution in reversed(executions(session or _session())):
+        if execution.type == "page":
+            return dict(execution.durees)
+    return {}
+
+
+def resume(session=None):
+    """Statistiques par bloc sur les exécutions gardées : {bloc: {n, moyenne_ms, p50_ms, p95_ms, max_ms}}"""
+    durees = defaultdict(list)
+    for execution in executions(session):
+        for nom, duree in execution.durees.items():
+            durees[nom].append(duree * 1000)
+    stats = {}
+    for nom, valeurs in durees.items():
+        v = np.asarray(valeurs)
+        stats[nom] = {"n": len(v), "moyenne_ms": float(v.mean()), "p50_ms": float(np.percentile(v, 50)),
+                      "p95_ms": float(np.percentile(v, 95)), "max_ms": float(v.max())}
+    return stats
+
+
+def histogramme(classes=20, session=None):
+    """Histogramme des durées totales d'exécution : (effectifs, bornes en ms)"""
+    totaux = [e.durees[TOTAL] * 1000 for e in executions(session) if TOTAL in e.durees]
+    if not totaux:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    return np.histogram(totaux, bins=classes)
+
+
+def exporter_json(session=None):
+    return json.dumps({"blocs": resume(session), "executions": [
+        {"type": e.type, "horodatage": e.horodatage, "durees_ms": {k: v * 1000 for k, v in e.durees.items()}}
+        for e in executions(session)
+    ]}, indent=2, ensure_ascii=False)
+
+
+def exporter_csv(session=None):
+    sortie = io.StringIO()
+    ecrivain = csv.writer(sortie)
+    ecrivain.writerow(["bloc", "n", "moyenne_ms", "p50_ms", "p95_ms", "max_ms"])
+    for nom, s in sorted(resume(session).items()):
+        ecrivain.writerow([nom, s["n"], f"{s['moyenne_ms']:.3f}", f"{s['p50_ms']:.3f}",
+                           f"{s['p95_ms']:.3f}", f"{s['max_ms']:.3f}"])
+    return sortie.getvalue()
@@ -0,0 +1,49 @@
+"""Images et vidéo de l'application, lues depuis le dépôt (plus de téléchargement GitHub).
+
+Les fichiers sont à côté de app.py. Les images sont réduites une fois à la
+largeur d'affichage ; le résultat reste en mémoire pour tout le processus
+(ce qui permet de le préparer avant la première visite, voir
+`prechauffage`) et Streamlit les sert avec leur type MIME.
+"""
+import io
+import mimetypes
+from functools import lru_cache
+from pathlib import Path
+
+DOSSIER = Path(__file__).resolve().parent.parent
+
+
+def chemin(nom):
+    """Chemin d'un fichier de l'application"""
+    return DOSSIER / nom
+
+
+def type_mime(nom):
+    """Type MIME d'après l'extension (ex. "image/png", "video/mp4")"""
+    return mimetypes.guess_type(nom)[0] or "application/octet-stream"
+
+
+@lru_cache(maxsize=8)
+def lire(nom):
+    """Contenu brut du fichier"""
+    return chemin(nom).read_bytes()
+
+
+@lru_cache(maxsize=16)
+def vignette(nom, largeur):
+    """Image réduite à `largeur` pixels (proportions conservées), au format PNG
+
+    Sans Pillow, l'image d'origine est renvoyée telle quelle.
+    """
+    donnees = lire(nom)
+    try:
+        from PIL import Image
+    except ImportError:
+        return donnees
+    with Image.open(io.BytesIO(donnees)) as image:
+        if image.width <= largeur:
+            return donnees
+        hauteur = round(image.height * largeur / image.width)
+        sortie = io.BytesIO()
+        image.resize((largeur, hauteur), Image.LANCZOS).save(sortie, format="PNG", optimize=True)
+    return sortie.getvalue()
@@ -0,0 +1,90 @@
+"""Mémoire des sessions : empreinte de chacune et libération des sessions inactives.
+
+Chaque session se signale à la fin de ses exécutions avec son empreinte
+mémoire et une fonction qui libère ce qu'elle peut reconstruire (ses
+figures : elles se recalculent à partir des populations rejouables). Une
+session restée inactive plus de INACTIVITE secondes est libérée par la
+prochaine session active ; au-delà de OUBLI secondes, elle disparaît du
+registre. La page enseignant lit ce registre pour la vue d'ensemble du
+serveur.
+
+Streamlit supprime de lui-même, après `server.disconnectedSessionTTL`, les
+sessions dont l'onglet est fermé ; ce registre s'occupe des onglets restés
+ouverts.
+"""
+import os
+import threading
+import time
+
+# Secondes sans activité avant de libérer la mémoire d'une session (HARDY_INACTIVITE)
+INACTIVITE = float(os.environ.get("HARDY_INACTIVITE", 15 * 60))
+# Secondes sans activité avant d'oublier la session
+OUBLI = 4 * INACTIVITE
+# Secondes entre deux recherches de sessions inactives
+VERIFICATION = 60
+
+
+class _Session:
+    __slots__ = ("session", "classe", "debut", "activite", "octets", "generations", "liberer", "liberee")
+
+    def __init__(self, session):
+        self.session = session
+        self.debut = self.activite = time.time()
+        self.classe = None
+        self.octets = self.generations = 0
+        self.liberer = None
+        self.liberee = False
+
+
+_sessions = {}
+_verrou = threading.Lock()
+_derniere_verification = 0.0
+
+
+def activite(session):
+    """Note que `session` vient de servir (sans recalculer son empreinte)"""
+    with _verrou:
+        fiche = _sessions.get(session)
+        if fiche is not None:
+            fiche.activite = time.time()
+
+
+def signaler(session, octets, generations, liberer, classe=None):
+    """Met à jour la fiche de `session` ; `liberer()` devra libérer sa mémoire reconstructible"""
+    with _verrou:
+        fiche = _sessions.get(session)
+        if fiche is None:
+            fiche = _sessions[session] = _Session(session)
+        fiche.activite = time.time()
+        fiche.octets, fiche.generations, fiche.liberer, fiche.classe = octets, generations, liberer, classe
+        fiche.liberee = False
+    if time.time() - _derniere_verification > VERIFICATION:
+        liberer_inactives()
+
+
+def liberer_inactives(maintenant=None):
+    """Libère les sessions inactives depuis INACTIVITE, oublie celles inactives depuis OUBLI ; renvoie le nombre libéré"""
+    global _derniere_verification
+    maintenant = time.time() if maintenant is None else maintenant
+    with _verrou:
+        _derniere_verification = maintenant
+        inactives = [f for f in _sessions.values() if not f.liberee and maintenant - f.activite > INACTIVITE]
+        for fiche in inactives:
+            fiche.liberee = True
+            fiche.octets = 0
+        for session in [s for s, f in _sessions.items() if maintenant - f.activite > OUBLI]:
+            del _sessions[session]
+    # Hors du verrou : la libération touche à l'état d'une autre session
+    for fiche in inactives:
+        if fiche.liberer is not None:
+            fiche.liberer()
+        fiche.liberer = None
+    return len(inactives)
+
+
+def sessions():
+    """Fiches des sessions connues (liste de dict), les plus lourdes d'abord"""
+    with _verrou:
+        fiches = [{nom: getattr(f, nom) for nom in _Session.__slots__ if nom != "liberer"}
+                  for f in _sessions.values()]
+    return sorted(fiches, key=lambda f: f["octets"], reverse=True)
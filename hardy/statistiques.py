@@ -0,0 +1,95 @@
+"""Statistiques de l'étape 2 : p le plus vraisemblable, test du khi² et test exact.
+
+Le test exact de Hardy-Weinberg (Wigginton, Cutler et Abecasis, 2005) ne
+dépend que de N et du nombre d'allèles rares : on calcule une fois, pour ce
+couple, la p-valeur (mi-p) de tous les nombres d'hétérozygotes possibles,
+puis chaque réexécution n'est qu'une lecture dans ce tableau. Les tableaux
+sont gardés en mémoire pour tout le processus, et construits seulement pour
+les couples rencontrés (tous les couples pour N=5000 feraient des millions
+de valeurs).
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+
+# Positions du curseur de l'étape 2 : p = 0.00, 0.01, ..., 1.00
+PAS_CURSEUR = 100
+
+
+def p_vraisemblance(nb_RR, nb_Rr, nb_rr):
+    """Estimation du maximum de vraisemblance de p : (2 RR + Rr) / 2N"""
+    taille = nb_RR + nb_Rr + nb_rr
+    return (2 * nb_RR + nb_Rr) / (2 * taille) if taille else float("nan")
+
+
+def khi2(nb_RR, nb_Rr, nb_rr):
+    """Test du khi² d'écart à Hardy-Weinberg (1 degré de liberté) : (statistique, p-valeur)"""
+    taille = nb_RR + nb_Rr + nb_rr
+    p = p_vraisemblance(nb_RR, nb_Rr, nb_rr)
+    attendus = taille * np.array([p * p, 2 * p * (1 - p), (1 - p) ** 2])
+    if taille == 0 or np.any(attendus == 0):
+        return 0.0, 1.0
+    statistique = float(np.sum((np.array([nb_RR, nb_Rr, nb_rr]) - attendus) ** 2 / attendus))
+    return statistique, math.erfc(math.sqrt(statistique / 2))
+
+
+@lru_cache(maxsize=256)
+def table_exacte(taille, rares):
+    """Loi exacte du nombre d'hétérozygotes et mi-p de chaque valeur, pour N et `rares` allèles rares
+
+    Renvoie (probabilites, mi_p), indexés par (hétérozygotes - rares % 2) // 2.
+    Les probabilités sont obtenues par la récurrence de Wigginton et al. :
+    P(h + 2) / P(h) = 4 · homozygotes rares · homozygotes communs / ((h + 1)(h + 2)).
+    """
+    hets = np.arange(rares % 2, rares + 1, 2)
+    rares_hom = (rares - hets) // 2
+    communs_hom = taille - hets - rares_hom
+    log_rapports = (np.log(4.0 * rares_hom[:-1] * communs_hom[:-1])
+                    - np.log((hets[:-1] + 1.0) * (hets[:-1] + 2.0)))
+    log_p = np.concatenate([[0.0], np.cumsum(log_rapports)])
+    probabilites = np.exp(log_p - log_p.max())
+    probabilites /= probabilites.sum()
+
+    # p-valeur : somme des probabilités au plus égales à celle observée (tolérance relative sur les égalités)
+    ordre = np.sort(probabilites)
+    cumul = np.cumsum(ordre)
+    rang = np.searchsorted(ordre, probabilites * (1 + 1e-7), side="right")
+    mi_p = np.clip(cumul[rang - 1] - probabilites / 2, 0.0, 1.0)
+    probabilites.flags.writeable = mi_p.flags.writeable = False
+    return probabilites, mi_p
+
+
+def test_exact(nb_RR, nb_Rr, nb_rr):
+    """Mi-p du test exact de Hardy-Weinberg pour ces effectifs"""
+    taille = nb_RR + nb_Rr + nb_rr
+    rares = min(2 * nb_RR + nb_Rr, 2 * nb_rr + nb_Rr)
+    if taille == 0 or rares == 0:
+        return 1.0
+    return float(table_exacte(taille, rares)[1][(nb_Rr - rares % 2) // 2])
+
+
+@lru_cache(maxsize=8)
+def effectifs_theoriques(taille):
+    """Effectifs théoriques (RR, Rr, rr) pour chaque position du curseur : tableau (101, 3)
+
+    Même calcul, en flottants Python, que l'étape 2 : q arrondi à 2 décimales
+    puis partie entière de p² N, 2pq N et q² N.
+    """
+    lignes = []
+    for i in range(PAS_CURSEUR + 1):
+        p = i / PAS_CURSEUR
+        q = round(1.0 - p, 2)
+        lignes.append((int((p**2) * taille), int((2 * p * q) * taille), int((q**2) * taille)))
+    table = np.array(lignes, dtype=np.int64)
+    table.flags.writeable = False
+    return table
+
+
+def effectifs_curseur(p, taille):
+    """Effectifs théoriques (RR, Rr, rr) pour la valeur `p` du curseur (lecture dans la table)"""
+    i = round(p * PAS_CURSEUR)
+    if i / PAS_CURSEUR == p:
+        return tuple(int(v) for v in effectifs_theoriques(taille)[i])
+    q = round(1.0 - p, 2)
+    return int((p**2) * taille), int((2 * p * q) * taille), int((q**2) * taille)
@@ -0,0 +1,211 @@
+"""Suivi de la classe : résultats de chaque session dans une base SQLite partagée.
+
+Les sessions des élèves ne font que déposer leurs résultats dans une file ;
+un fil d'écriture unique les regroupe et les écrit par lots, dans une seule
+transaction, sur l'unique connexion du processus (mode WAL : la page
+enseignant peut lire pendant l'écriture). Une réexécution n'attend donc
+jamais le disque. Dans un même lot, seul le dernier état de chaque session
+(et de chaque trajectoire) est écrit.
+
+Base : fichier `classe.sqlite3` à la racine du dépôt, ou HARDY_BASE. Si elle
+ne peut pas être ouverte (dossier en lecture seule...), le suivi est
+désactivé : l'application des élèves continue sans lui.
+"""
+import atexit
+import contextlib
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+
+from hardy.ressources import DOSSIER
+
+CHEMIN = os.environ.get("HARDY_BASE", str(DOSSIER / "classe.sqlite3"))
+CLASSE_DEFAUT = "défaut"
+# Attente maximale avant l'écriture d'un lot incomplet (secondes)
+DELAI = 0.5
+TAILLE_LOT = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session TEXT PRIMARY KEY,
+    classe TEXT NOT NULL,
+    debut REAL NOT NULL,
+    maj REAL NOT NULL,
+    nb_bleus INTEGER, nb_magentas INTEGER, nb_verts INTEGER,
+    p_ajuste REAL,
+    nb_essais INTEGER
+);
+CREATE TABLE IF NOT EXISTS trajectoires (
+    session TEXT NOT NULL,
+    taille INTEGER NOT NULL,
+    graine INTEGER NOT NULL,
+    p0 REAL NOT NULL,
+    generations INTEGER NOT NULL,
+    p BLOB NOT NULL,
+    maj REAL NOT NULL,
+    PRIMARY KEY (session, taille)
+);
+CREATE INDEX IF NOT EXISTS sessions_classe ON sessions (classe);
+"""
+
+_SESSION = """
+INSERT INTO sessions
+VALUES (:session, :classe, :maj, :maj, :nb_bleus, :nb_magentas, :nb_verts, :p_ajuste, :nb_essais)
+ON CONFLICT (session) DO UPDATE SET
+    classe = excluded.classe, maj = excluded.maj, nb_bleus = excluded.nb_bleus,
+    nb_magentas = excluded.nb_magentas, nb_verts = excluded.nb_verts, p_ajuste = excluded.p_ajuste,
+    nb_essais = excluded.nb_essais
+"""
+_TRAJECTOIRE = "INSERT OR REPLACE INTO trajectoires VALUES (:session, :taille, :graine, :p0, :generations, :p, :maj)"
+
+
+class Suivi:
+    """Connexion SQLite du processus et fil d'écriture par lots"""
+
+    actif = True
+
+    def __init__(self, chemin=CHEMIN):
+        self._connexion = sqlite3.connect(chemin, check_same_thread=False, isolation_level=None)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("PRAGMA synchronous=NORMAL")
+        self._connexion.executescript(SCHEMA)
+        self._verrou = threading.Lock()
+        self._file = queue.SimpleQueue()
+        self._fil = threading.Thread(target=self._ecrire, name="hardy-suivi", daemon=True)
+        self._fil.start()
+
+    # --- ÉCRITURE (côté élèves : ne bloque jamais) ---
+    def session(self, session, classe, nb_bleus, nb_magentas, nb_verts, p_ajuste, nb_essais):
+        """Population initiale (R//R, R//r, r//r), p du curseur et nombre d'essais de la session"""
+        self._file.put(("session", session, dict(
+            session=session, classe=classe, nb_bleus=nb_bleus, nb_magentas=nb_magentas, nb_verts=nb_verts,
+            p_ajuste=p_ajuste, nb_essais=nb_essais, maj=time.time())))
+
+    def trajectoire(self, session, taille, graine, p0, p):
+        """`p` : fréquence de R à chaque génération (stockée en float32)"""
+        p = np.asarray(p, dtype=np.float32)
+        self._file.put(("trajectoire", (session, taille), dict(
+            session=session, taille=taille, graine=graine, p0=p0, generations=len(p) - 1,
+            p=p.tobytes(), maj=time.time())))
+
+    def _ecrire(self):
+        while True:
+            message = self._file.get()
+            if message is None:
+                return
+            lot = {message[:2]: message[2]}
+            echeance = time.monotonic() + DELAI
+            fin = False
+            while len(lot) < TAILLE_LOT:
+                try:
+                    message = self._file.get(timeout=max(echeance - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if message is None:
+                    fin = True
+                    break
+                lot[message[:2]] = message[2]
+            self._valider(lot)
+            if fin:
+                return
+
+    def _valider(self, lot):
+        sessions = [v for (genre, _), v in lot.items() if genre == "session"]
+        trajectoires = [v for (genre, _), v in lot.items() if genre == "trajectoire"]
+        with self._verrou:
+            try:
+                self._connexion.execute("BEGIN")
+                self._connexion.executemany(_SESSION, sessions)
+                self._connexion.executemany(_TRAJECTOIRE, trajectoires)
+                self._connexion.execute("COMMIT")
+            except Exception as erreur:
+                # Base verrouillée, disque plein, valeur inattendue : on perd ce lot, pas le fil d'écriture
+                print(f"Suivi de la classe : {len(lot)} résultat(s) non enregistré(s) ({erreur})", file=sys.stderr)
+                with contextlib.suppress(sqlite3.Error):
+                    if self._connexion.in_transaction:
+                        self._connexion.execute("ROLLBACK")
+
+    def fermer(self):
+        """Écrit ce qui reste dans la file puis arrête le fil d'écriture"""
+        if self._fil.is_alive():
+            self._file.put(None)
+            self._fil.join()
+
+    # --- LECTURE (page enseignant) ---
+    def classes(self):
+        with self._verrou:
+            return [c for (c,) in self._connexion.execute("SELECT DISTINCT classe FROM sessions ORDER BY classe")]
+
+    def sessions(self, classe):
+        """Lignes de la table `sessions` pour cette classe (liste de dict)"""
+        with self._verrou:
+            curseur = self._connexion.execute(
+                "SELECT * FROM sessions WHERE classe = ? ORDER BY debut", (classe,))
+            noms = [d[0] for d in curseur.description]
+            return [dict(zip(noms, ligne)) for ligne in curseur]
+
+    def trajectoires(self, classe, taille):
+        """Matrice (sessions, générations + 1) des p de la classe pour cette taille, complétée par NaN"""
+        with self._verrou:
+            blobs = [b for (b,) in self._connexion.execute(
+                "SELECT t.p FROM trajectoires t JOIN sessions s USING (session) "
+                "WHERE s.classe = ? AND t.taille = ?", (classe, taille))]
+        series = [np.frombuffer(b, dtype=np.float32) for b in blobs]
+        matrice = np.full((len(series), max(map(len, series), default=0)), np.nan, dtype=np.float32)
+        for i, serie in enumerate(series):
+            matrice[i, :len(serie)] = serie
+        return matrice
+
+
+class SuiviInactif:
+    """Remplace `Suivi` quand la base ne peut pas être ouverte : rien n'est enregistré ni lu"""
+
+    actif = False
+
+    def __init__(self, erreur):
+        self.erreur = erreur
+
+    def session(self, *args, **kwargs):
+        pass
+
+    def trajectoire(self, *args, **kwargs):
+        pass
+
+    def fermer(self):
+        pass
+
+    def classes(self):
+        return []
+
+    def sessions(self, classe):
+        return []
+
+    def trajectoires(self, classe, taille):
+        return np.zeros((0, 0), dtype=np.float32)
+
+
+_suivi = None
+_verrou_suivi = threading.Lock()
+
+
+def suivi():
+    """Instance partagée par toutes les sessions du processus, créée au premier besoin
+
+    Si la base ne peut pas être ouverte, renvoie un `SuiviInactif` (une seule
+    tentative par processus).
+    """
+    global _suivi
+    with _verrou_suivi:
+        if _suivi is None:
+            try:
+                _suivi = Suivi()
+            except sqlite3.Error as erreur:
+                print(f"Suivi de la classe désactivé : impossible d'ouvrir {CHEMIN} ({erreur})", file=sys.stderr)
+                _suivi = SuiviInactif(f"{CHEMIN} : {erreur}")
+            atexit.register(_suivi.fermer)
+        return _suivi
@@ -0,0 +1,48 @@
+"""Enveloppe théorique de la dérive : choix automatique de la méthode de calcul.
+
+- chaîne de Markov exacte pour les petites populations (N <= markov.TAILLE_MAX)
+- approximation de diffusion tant que p reste loin de 0 et 1 sur l'horizon demandé
+- Monte-Carlo (mode ensemble) sinon
+"""
+import numpy as np
+
+from hardy import diffusion, markov
+from hardy.ensemble import simuler_ensemble
+
+METHODES = ("exacte", "diffusion", "monte-carlo")
+NOMS_METHODES = {
+    "exacte": "calcul exact (chaîne de Markov)",
+    "diffusion": "approximation de diffusion",
+    "monte-carlo": "simulation de milliers de populations",
+}
+# Nombre d'écarts-types qui doivent séparer p0 de 0 et de 1 pour utiliser la diffusion
+MARGE_DIFFUSION = 3
+
+
+def choisir_methode(taille, p0, generations):
+    """Méthode la moins coûteuse qui reste fiable pour (N, p0, horizon)"""
+    if taille <= markov.TAILLE_MAX:
+        return "exacte"
+    ecart = np.sqrt(diffusion.variance(taille, p0, generations)[-1])
+    if min(p0, 1 - p0) >= MARGE_DIFFUSION * ecart:
+        return "diffusion"
+    return "monte-carlo"
+
+
+def enveloppe(taille, p0, generations, methode="auto", operateur=None, graine=None):
+    """Médiane et bande 5 %–95 % de p sur les générations 0..G
+
+    Retourne (Historique, méthode utilisée). `operateur` permet de fournir
+    une `markov.OperateurDerive` déjà construite (mise en cache par l'appelant).
+    """
+    if methode == "auto":
+        methode = choisir_methode(taille, p0, generations)
+    if methode == "exacte":
+        hist = markov.quantiles_exacts(operateur or markov.OperateurDerive(taille), p0, generations)
+    elif methode == "diffusion":
+        hist = diffusion.enveloppe(taille, p0, generations)
+    elif methode == "monte-carlo":
+        hist = simuler_ensemble((taille,), p0, generations, graine=graine)[taille]
+    else:
+        raise ValueError(f"Méthode inconnue : {methode!r} (attendu : auto, {', '.join(METHODES)})")
+    return hist, methode
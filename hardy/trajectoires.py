@@ -0,0 +1,182 @@
+"""Populations rejouables : graine + paramètres au lieu de l'historique complet.
+
+La session ne conserve qu'une `Population` (quelques entiers). La trajectoire
+est recalculée à la demande, de façon déterministe, à partir de
+(graine, tailles, p0, générations) ; les trajectoires déjà calculées sont
+gardées dans un petit cache LRU partagé par toutes les sessions. Au-delà de
+LIGNES_MAX générations, l'historique d'une trajectoire est compacté (passé
+lointain résumé par blocs) : sa taille en mémoire reste bornée.
+"""
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from hardy.engine import GENOTYPES, Forces, sans_effet, simuler
+from hardy.historique import Historique
+from hardy.individus import PopulationIndividus, effectifs_hw
+
+TAILLE_CACHE = 64
+# Générations gardées au plus par historique (réglable par HARDY_LIGNES_MAX)
+LIGNES_MAX = int(os.environ.get("HARDY_LIGNES_MAX", 4000))
+# "proportions" : génotypes tirés directement selon p², 2pq, q² (engine.simuler)
+# "individus" : chaque oiseau est simulé, accouplements aléatoires compris
+MODES = ("proportions", "individus")
+
+
+def nouvelle_graine():
+    """Graine aléatoire courte (lisible par un enseignant)"""
+    return secrets.randbits(32)
+
+
+@dataclass(frozen=True)
+class Population:
+    """Simulation rejouable d'un groupe de populations tirées ensemble
+
+    `effectifs0` donne, pour chaque taille, les effectifs (RR, Rr, rr) de la
+    génération 0 ; s'il est absent l'historique des génotypes commence à G=1
+    (et, en mode "individus", on part des proportions de Hardy-Weinberg).
+    `forces` (sélection, mutation, migration) n'existe qu'en mode "proportions".
+    """
+    graine: int
+    tailles: tuple
+    p0: float
+    generations: int = 0
+    effectifs0: tuple = None
+    mode: str = "proportions"
+    forces: Forces = None
+
+    def avancer(self, n):
+        """Même population, `n` générations plus loin"""
+        return replace(self, generations=self.generations + n)
+
+    @property
+    def lignee(self):
+        """Clé commune à toutes les générations d'une même simulation"""
+        return (self.graine, self.tailles, self.p0, self.effectifs0, self.mode, self.forces)
+
+
+class Trajectoire:
+    """Trajectoire matérialisée d'une `Population`, prolongeable sur place"""
+
+    def __init__(self, population):
+        self.lignee = population.lignee
+        self.tailles = np.asarray(population.tailles)
+        self.generations = 0
+        self.alleles = [Historique(("p", "q")) for _ in population.tailles]
+        self.genotypes = [Historique(GENOTYPES, dtype=np.int64) for _ in population.tailles]
+        self._rng = np.random.default_rng(population.graine)
+        for j, _ in enumerate(population.tailles):
+            self.alleles[j].ajouter(0, [population.p0, 1 - population.p0])
+            if population.effectifs0 is not None:
+                self.genotypes[j].ajouter(0, population.effectifs0[j])
+        self._p = np.full(len(population.tailles), float(population.p0))
+        self._forces = population.forces
+        self._individus = None
+        # Un seul fil à la fois prolonge cette lignée
+        self.verrou = threading.Lock()
+        if population.mode == "individus":
+            if not sans_effet(population.forces):
+                raise ValueError("Les forces évolutives ne sont simulées qu'en mode \"proportions\"")
+            # Un flux aléatoire par population (nombre fixe de tirages par génération) :
+            # prolonger de 10 puis 10 générations donne la même trajectoire que 20 d'un coup
+            flux = np.random.SeedSequence(population.graine).spawn(len(population.tailles))
+            self._individus = [
+                PopulationIndividus(population.effectifs0[j] if population.effectifs0 is not None
+                                    else effectifs_hw(n, population.p0), np.random.default_rng(flux[j]))
+                for j, n in enumerate(population.tailles)
+            ]
+
+    @property
+    def octets(self):
+        """Mémoire des historiques de la trajectoire"""
+        return sum(hist.octets for hist in self.alleles + self.genotypes)
+
+    def prolonger(self, n):
+        """Ajoute `n` générations en reprenant le flux aléatoire là où il s'était arrêté"""
+        if self._individus is None:
+            tirages, freqs = simuler(self.tailles, self._p, n, self._rng, self._forces)
+        else:
+            resultats = [pop.simuler(n) for pop in self._individus]
+            tirages = np.stack([r[0] for r in resultats], axis=1)
+            freqs = np.stack([r[1] for r in resultats], axis=1)
+        gens = np.arange(1, n + 1) + self.generations
+        for j in range(len(self.tailles)):
+            self.genotypes[j].ajouter(gens, tirages[:, j])
+            self.alleles[j].ajouter(gens, np.column_stack([freqs[1:, j], 1 - freqs[1:, j]]))
+        self._p = freqs[-1]
+        self.generations += n
+        for hist in self.alleles + self.genotypes:
+            hist.compacter(LIGNES_MAX)
+
+
+class Instantane:
+    """Copie figée d'une `Trajectoire` arrêtée à une génération (ce que renvoie `trajectoire()`)"""
+
+    def __init__(self, lignee, tailles, generations, alleles, genotypes):
+        self.lignee = lignee
+        self.tailles = tailles
+        self.generations = generations
+        self.alleles = alleles
+        self.genotypes = genotypes
+
+    @property
+    def octets(self):
+        return sum(hist.octets for hist in self.alleles + self.genotypes)
+
+
+_cache = OrderedDict()
+_verrou = threading.Lock()
+
+
+def trajectoires_en_cache():
+    """Copie du contenu du cache partagé : {lignée: Trajectoire}"""
+    with _verrou:
+        return dict(_cache)
+
+
+def _instantane(traj, generations):
+    """Copie de `traj` arrêtée à `generations`, ou None si cette génération a été résumée par compactage"""
+    alleles = [hist.extrait(generations) for hist in traj.alleles]
+    genotypes = [hist.extrait(generations) for hist in traj.genotypes]
+    if any(hist is None for hist in alleles + genotypes):
+        return None
+    return Instantane(traj.lignee, traj.tailles, generations, alleles, genotypes)
+
+
+def trajectoire(population):
+    """Trajectoire de `population`, recalculée seulement si elle n'est pas en cache
+
+    Le cache est indexé par lignée : passer de G à G+10 générations prolonge
+    la trajectoire existante au lieu de tout recalculer, et une génération
+    déjà dépassée (lecture automatique en avance sur l'affichage) est lue
+    dans la trajectoire en cache. Le verrou du cache ne sert qu'à la
+    recherche et à l'insertion ; le calcul se fait sous le verrou propre à
+    la lignée, si bien que les sessions ne s'attendent pas entre elles.
+    Renvoie une copie (`Instantane`) que les autres fils ne modifient plus.
+    """
+    lignee = population.lignee
+    with _verrou:
+        traj = _cache.get(lignee)
+        if traj is not None:
+            _cache.move_to_end(lignee)
+    if traj is None:
+        nouvelle = Trajectoire(population)
+        with _verrou:
+            traj = _cache.setdefault(lignee, nouvelle)
+            _cache.move_to_end(lignee)
+            while len(_cache) > TAILLE_CACHE:
+                _cache.popitem(last=False)
+    with traj.verrou:
+        if traj.generations < population.generations:
+            traj.prolonger(population.generations - traj.generations)
+        instantane = _instantane(traj, population.generations)
+    if instantane is None:
+        # Génération tombée dans le passé compacté : on la rejoue à part, sans toucher au cache
+        traj = Trajectoire(population)
+        traj.prolonger(population.generations)
+        instantane = _instantane(traj, population.generations)
+    return instantane
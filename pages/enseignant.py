@@ -0,0 +1,116 @@
+"""Page enseignant : résultats de toute la classe, lus dans la base partagée."""
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from hardy import sessions
+from hardy.suivi import CLASSE_DEFAUT, suivi
+from hardy.trajectoires import trajectoires_en_cache
+
+st.set_page_config(page_title="Tableau de bord enseignant", layout="wide", page_icon="👩‍🏫")
+
+# Accès protégé par HARDY_MOT_DE_PASSE : sans lui, la page reste fermée
+MOT_DE_PASSE = os.environ.get("HARDY_MOT_DE_PASSE")
+# Tailles de population suivies, dans l'ordre de l'exercice
+TAILLES = (5000, 10000, 500, 20000)
+
+
+# --- LECTURES (rafraîchies toutes les quelques secondes, pas à chaque clic) ---
+@st.cache_data(ttl=5)
+def sessions_classe(classe):
+    return pd.DataFrame(suivi().sessions(classe))
+
+@st.cache_data(ttl=5)
+def trajectoires_classe(classe, taille):
+    return suivi().trajectoires(classe, taille)
+
+def figure_classe(matrice, taille):
+    """Médiane, bande 5 %–95 % et extrêmes des p de la classe, génération par génération"""
+    x = np.arange(matrice.shape[1])
+    presentes = np.isfinite(matrice).sum(axis=0)
+    bas, mediane, haut = np.nanquantile(matrice, [0.05, 0.5, 0.95], axis=0)
+    fig = go.Figure([
+        go.Scatter(x=x, y=haut, mode="lines", line_width=0, showlegend=False, hoverinfo="skip"),
+        go.Scatter(x=x, y=bas, mode="lines", line_width=0, fill="tonexty",
+                   fillcolor="rgba(99, 110, 250, 0.25)", name="90 % des élèves"),
+        go.Scatter(x=x, y=mediane, mode="lines", line_color="#636efa", name="Médiane de p (R)",
+                   customdata=presentes, hovertemplate="G=%{x} : p=%{y:.3f} (%{customdata} élèves)"),
+        go.Scatter(x=x, y=np.nanmin(matrice, axis=0), mode="lines", line=dict(color="grey", dash="dot"),
+                   name="Minimum"),
+        go.Scatter(x=x, y=np.nanmax(matrice, axis=0), mode="lines", line=dict(color="grey", dash="dot"),
+                   name="Maximum"),
+    ])
+    fig.update_layout(title=f"N={taille} : {len(matrice)} trajectoires", xaxis_title="G",
+                      yaxis_title="Freq", yaxis_range=[0, 1])
+    return fig
+
+
+st.title("👩‍🏫 Tableau de bord de la classe")
+
+if not MOT_DE_PASSE:
+    st.warning("Page fermée : définissez la variable d'environnement HARDY_MOT_DE_PASSE sur le serveur "
+               "pour ouvrir le tableau de bord (il montre les résultats de tous les élèves).")
+    st.stop()
+if st.text_input("Mot de passe", type="password") != MOT_DE_PASSE:
+    st.stop()
+
+# --- SERVEUR : SESSIONS EN COURS ET MÉMOIRE ---
+with st.expander("🖥️ Serveur : sessions en cours et mémoire"):
+    fiches = pd.DataFrame(sessions.sessions())
+    cache = trajectoires_en_cache()
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Sessions actives", int((~fiches["liberee"]).sum()) if len(fiches) else 0)
+    c2.metric("Mémoire des sessions", f"{fiches['octets'].sum() / 1e6:.1f} Mo" if len(fiches) else "0 Mo")
+    c3.metric(f"Trajectoires en cache ({len(cache)})",
+              f"{sum(traj.octets for traj in cache.values()) / 1e6:.1f} Mo")
+    if len(fiches):
+        st.dataframe(fiches.assign(
+            session=fiches["session"].str[:8], ko=(fiches["octets"] / 1e3).round(1),
+            debut=pd.to_datetime(fiches["debut"], unit="s"), activite=pd.to_datetime(fiches["activite"], unit="s"))
+            .drop(columns=["octets"]), use_container_width=True, hide_index=True)
+    st.caption(f"Une session sans activité depuis {sessions.INACTIVITE / 60:.0f} min voit ses figures libérées "
+               f"(« liberee ») ; elles se reconstruisent si l'élève revient. Réglable par HARDY_INACTIVITE.")
+
+if not suivi().actif:
+    st.error(f"Base de la classe inaccessible, les résultats des élèves ne sont pas enregistrés : "
+             f"{suivi().erreur}. Choisir un fichier accessible en écriture avec HARDY_BASE.")
+    st.stop()
+
+classes = suivi().classes()
+if not classes:
+    st.info(f"Aucun résultat pour l'instant. Les élèves d'une classe ouvrent l'application avec "
+            f"`?classe=<nom>` dans l'adresse (sinon ils sont rangés dans « {CLASSE_DEFAUT} »).")
+    st.stop()
+
+classe = st.selectbox("Classe", classes)
+if st.button("🔄 Actualiser"):
+    # Seulement les lectures de cette page : les caches des élèves (ensembles, enveloppes) restent
+    sessions_classe.clear()
+    trajectoires_classe.clear()
+
+df = sessions_classe(classe)
+c1, c2, c3 = st.columns(3)
+c1.metric("Sessions", len(df))
+c2.metric("p ajusté (médiane)", f"{df['p_ajuste'].median():.2f}")
+c3.metric("Essais avant le matching (médiane)", f"{df['nb_essais'].median():.0f}")
+
+st.subheader("Dérive des fréquences dans la classe")
+colonnes = st.columns(2)
+affichees = 0
+for taille in TAILLES:
+    matrice = trajectoires_classe(classe, taille)
+    if matrice.size == 0:
+        continue
+    with colonnes[affichees % 2]:
+        st.plotly_chart(figure_classe(matrice, taille), use_container_width=True, key=f"classe_{taille}")
+    affichees += 1
+if affichees == 0:
+    st.caption("Aucune simulation enregistrée pour cette classe.")
+
+st.subheader("Détail par session")
+st.dataframe(df.drop(columns=["classe"]).assign(
+    debut=pd.to_datetime(df["debut"], unit="s"), maj=pd.to_datetime(df["maj"], unit="s")),
+    use_container_width=True, hide_index=True)
@@ -0,0 +1,69 @@
+"""Compactage de l'historique : nombre de lignes borné, moyennes conservées"""
+import numpy as np
+import pytest
+
+from hardy.historique import Historique
+
+
+def prolonger(hist, generations, paquet, lignes_max, rng):
+    """Ajoute `generations` lignes par paquets, en compactant après chacun (comme `Trajectoire`)"""
+    debut = len(hist) and int(hist.generations[-1]) + 1
+    for g in range(debut, debut + generations, paquet):
+        gens = np.arange(g, min(g + paquet, debut + generations))
+        p = rng.random(len(gens))
+        hist.ajouter(gens, np.column_stack([p, 1 - p]))
+        hist.compacter(lignes_max)
+        assert len(hist) <= lignes_max
+
+
+def integrale(hist):
+    """Somme des valeurs pondérées par la durée de chaque ligne (jusqu'à la dernière, exclue)"""
+    return np.diff(hist.generations) @ hist.valeurs[:-1]
+
+
+@pytest.mark.parametrize("generations, paquet, lignes_max", [
+    (100_000, 10, 400),
+    (2_000_000, 1000, 4000),
+])
+def test_lignes_bornees(generations, paquet, lignes_max):
+    hist = Historique(("p", "q"))
+    prolonger(hist, generations, paquet, lignes_max, np.random.default_rng(0))
+    assert hist.compactions > 0
+    assert hist.generations[-1] == generations - 1
+    # Les générations récentes restent intactes
+    assert np.array_equal(hist.generations[-(lignes_max // 2):],
+                          np.arange(generations - lignes_max // 2, generations))
+
+
+def test_moyenne_ponderee_conservee():
+    rng = np.random.default_rng(1)
+    hist = Historique(("p", "q"))
+    for _ in range(5):
+        debut = len(hist) and int(hist.generations[-1]) + 1
+        p = rng.random(5000)
+        hist.ajouter(np.arange(debut, debut + 5000), np.column_stack([p, 1 - p]))
+        avant = integrale(hist)
+        assert hist.compacter(400)
+        np.testing.assert_allclose(integrale(hist), avant, rtol=1e-12)
+
+
+def test_extrait_passe_resume():
+    hist = Historique(("p", "q"))
+    prolonger(hist, 3000, 100, 400, np.random.default_rng(2))
+    premiere_intacte = int(hist.generations[hist._resumees])
+    assert hist.extrait(0) is None
+    assert hist.extrait(premiere_intacte - 1) is None
+
+    copie = hist.extrait(premiere_intacte + 10)
+    assert copie.generations[-1] == premiere_intacte + 10
+    assert np.array_equal(copie.valeurs, hist.valeurs[:len(copie)])
+    # La copie ne partage rien avec l'historique qui continue d'avancer
+    hist.valeurs[:] = -1
+    assert (copie.valeurs >= 0).all()
+
+
+def test_extrait_sans_compactage():
+    hist = Historique(("p", "q"))
+    hist.ajouter(np.arange(10), np.column_stack([np.linspace(0, 1, 10), np.linspace(1, 0, 10)]))
+    copie = hist.extrait(4)
+    assert list(copie.generations) == [0, 1, 2, 3, 4]
@@ -0,0 +1,38 @@
+"""Accouplements du mode "individus" : pas de biais de tirage des couples"""
+import numpy as np
+import pytest
+
+from hardy.individus import PopulationIndividus
+
+
+@pytest.mark.parametrize("effectifs", [(0, 1, 4), (2, 3, 2), (1, 0, 0)])
+def test_derive_sans_biais_n_impair(effectifs):
+    # La dérive seule ne change pas p en moyenne, même pour un N impair où un oiseau reste seul
+    rng = np.random.default_rng(3)
+    pops = [PopulationIndividus(effectifs, rng) for _ in range(20_000)]
+    p0 = pops[0].frequence()
+    for pop in pops:
+        pop.generation()
+    moyenne = np.mean([pop.frequence() for pop in pops])
+    ecart_type = np.sqrt(p0 * (1 - p0) / (2 * pops[0].taille) / len(pops))
+    assert abs(moyenne - p0) < 5 * ecart_type + 1e-12
+
+
+def test_tous_les_couples_accessibles():
+    # Chaque couple (2c, 2c + 1) et l'oiseau seul sont tirés, dans les proportions attendues
+    taille = 9
+    pop = PopulationIndividus((0, 0, taille), np.random.default_rng(4))
+    comptes = np.zeros(taille, dtype=np.int64)
+    for _ in range(2000):
+        pop.generation()
+        comptes += np.bincount(pop._indices - 1, minlength=taille)
+    couples, seul = comptes[0:taille - 1:2], comptes[taille - 1]
+    attendu = 2000 * taille / (taille / 2)
+    np.testing.assert_allclose(couples, attendu, rtol=0.05)
+    np.testing.assert_allclose(seul, attendu / 2, rtol=0.1)
+
+
+def test_tirage_en_double_precision():
+    # En float32, au-delà de 2^24 oiseaux certains couples ne pourraient jamais être choisis
+    pop = PopulationIndividus((1, 1, 1))
+    assert pop._tirage.dtype == np.float64
@@ -0,0 +1,47 @@
+"""Rejouabilité des trajectoires : même graine, mêmes courbes, quel que soit le découpage"""
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from hardy.engine import Forces
+from hardy.trajectoires import Population, Trajectoire
+
+
+def population(mode, tailles=(51, 200)):
+    effectifs0 = tuple((n // 4, n - n // 4 - n // 4, n // 4) for n in tailles)
+    return Population(graine=7, tailles=tailles, p0=0.5, effectifs0=effectifs0, mode=mode)
+
+
+def prolongee(pop, paquets):
+    traj = Trajectoire(pop)
+    for n in paquets:
+        traj.prolonger(n)
+    return traj
+
+
+@pytest.mark.parametrize("mode", ["proportions", "individus"])
+def test_rejeu_independant_du_decoupage(mode):
+    pop = population(mode)
+    d_un_coup = prolongee(pop, [20])
+    par_clics = prolongee(pop, [10, 7, 3])
+    for a, b in zip(d_un_coup.alleles + d_un_coup.genotypes, par_clics.alleles + par_clics.genotypes):
+        assert np.array_equal(a.generations, b.generations)
+        assert np.array_equal(a.valeurs, b.valeurs)
+
+
+def test_individus_un_flux_par_population():
+    # Une population ne dépend pas des autres tirées avec elle
+    seule = prolongee(population("individus", tailles=(51,)), [15])
+    groupe = prolongee(population("individus", tailles=(51, 200)), [15])
+    assert np.array_equal(seule.alleles[0].valeurs, groupe.alleles[0].valeurs)
+
+
+def test_forces_et_neutre_meme_hasard():
+    pop = population("proportions", tailles=(1000,))
+    neutre = prolongee(pop, [30]).alleles[0].valeurs[:, 0]
+    presque = prolongee(replace(pop, forces=Forces(mutation=(1e-6, 0))), [30]).alleles[0].valeurs[:, 0]
+    forte = prolongee(replace(pop, forces=Forces(mutation=(0.02, 0))), [30]).alleles[0].valeurs[:, 0]
+    # Une force négligeable laisse la courbe presque inchangée ; une mutation R -> r la fait baisser partout
+    assert np.abs(presque - neutre).max() < 0.005
+    assert (forte[1:] <= neutre[1:]).all()